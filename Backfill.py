@@ -0,0 +1,52 @@
+import os
+from Database import DB_PATH, bump_version, connect_writer, migrate, movie_info_from_tmdb, update_movie_info
+from TMDBClient import TMDBClient
+
+# Fills tmdb_id and the display columns for movies inserted before they existed.
+# Usage: python Backfill.py
+
+TMDB_API_KEY = os.getenv("TMDB_API_KEY")
+TMDB_READ_TOKEN = os.getenv("TMDB_READ_TOKEN")
+
+
+def backfill_movies(db_path=DB_PATH, batch_size=50):
+    """
+    Looks up every movie without a tmdb_id on TMDB and stores its display fields.
+
+    Parameters:
+        db_path (str): Path to your SQLite database
+        batch_size (int): Number of movies resolved concurrently per batch
+    """
+    migrate(db_path)
+    client = TMDBClient(TMDB_API_KEY, TMDB_READ_TOKEN,
+                        base_url=os.getenv("TMDB_BASE_URL", "https://api.themoviedb.org/3"))
+
+    conn = connect_writer(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, imdb_id FROM movies WHERE tmdb_id IS NULL AND imdb_id IS NOT NULL")
+    rows = cursor.fetchall()
+    print(f"Backfilling {len(rows)} movies")
+
+    updated = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        details = client.find_movies([imdb_id for _, imdb_id in batch])
+
+        found = [(movie_id, details[imdb_id]) for movie_id, imdb_id in batch if details.get(imdb_id)]
+        credits = client.get_many([(f"movie/{movie['id']}/credits", None) for _, movie in found])
+
+        for (movie_id, movie), movie_credits in zip(found, credits):
+            crew = (movie_credits or {}).get("crew", [])
+            director = next((member["name"] for member in crew if member["job"] == "Director"), "Unknown")
+            update_movie_info(cursor, movie_id, movie_info_from_tmdb(movie, director))
+            updated += 1
+
+        bump_version(cursor, "catalogue")
+        conn.commit()
+        print(f"Backfilled {updated}/{len(rows)} movies")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    backfill_movies()
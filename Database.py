@@ -0,0 +1,280 @@
+import os
+import queue
+import sqlite3
+
+DB_PATH = os.getenv("STREAMSAFE_DB", "movies.db")
+
+# Read-side tuning for the web process
+READ_MMAP_SIZE = 256 * 1024 * 1024
+READ_CACHE_KIB = 16 * 1024
+STATEMENT_CACHE_SIZE = 256
+
+# Display columns stored on movies so pages can render without calling TMDB
+MOVIE_COLUMNS = {
+    "tmdb_id": "INTEGER",
+    "poster_path": "TEXT",
+    "release_year": "INTEGER",
+    "genres": "TEXT",
+    "overview": "TEXT",
+    "director": "TEXT",
+}
+
+# Byte order of movies.trigger_mask; bit N is set when trigger_definitions.id N has value = 1
+MASK_BYTE_ORDER = "little"
+
+
+def migrate(db_path=DB_PATH):
+    """
+    Brings the movies.db schema up to date. Safe to run repeatedly.
+
+    Parameters:
+        db_path (str): Path to your SQLite database
+    """
+    conn = connect_writer(db_path)
+
+    # WAL lets the web tier keep reading while ingestion writes (the setting persists in the file)
+    conn.execute("PRAGMA journal_mode = WAL")
+
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(movies)")}
+    for column, column_type in MOVIE_COLUMNS.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE movies ADD COLUMN {column} {column_type}")
+
+    # Per-movie trigger bitset, built once from the triggers table when the column is added
+    if "trigger_mask" not in existing:
+        conn.execute("ALTER TABLE movies ADD COLUMN trigger_mask BLOB")
+        refresh_trigger_masks(conn.cursor())
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_movies_tmdb_id ON movies(tmdb_id)")
+
+    # One row per film: ingestion upserts on imdb_id so re-analysed movies keep their id
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_movies_imdb_id ON movies(imdb_id)")
+
+    # Covering index for the "movies without any selected trigger" anti-join
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_triggers_trigger_value_movie ON triggers(trigger_id, value, movie_id)")
+
+    # Trigram full-text index over titles, kept in sync with movies by triggers
+    has_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'movies_fts'").fetchone()
+    conn.executescript("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5(
+            title, content='movies', content_rowid='id', tokenize='trigram'
+        );
+        CREATE TRIGGER IF NOT EXISTS movies_fts_insert AFTER INSERT ON movies BEGIN
+            INSERT INTO movies_fts (rowid, title) VALUES (new.id, new.title);
+        END;
+        CREATE TRIGGER IF NOT EXISTS movies_fts_delete AFTER DELETE ON movies BEGIN
+            INSERT INTO movies_fts (movies_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        END;
+        CREATE TRIGGER IF NOT EXISTS movies_fts_update AFTER UPDATE OF title ON movies BEGIN
+            INSERT INTO movies_fts (movies_fts, rowid, title) VALUES ('delete', old.id, old.title);
+            INSERT INTO movies_fts (rowid, title) VALUES (new.id, new.title);
+        END;
+    """)
+    if not has_fts:
+        conn.execute("INSERT INTO movies_fts (movies_fts) VALUES ('rebuild')")
+
+    # Slim card records (just what the movie grid renders), kept in sync with movies by triggers
+    has_cards = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'movie_cards'").fetchone()
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS movie_cards (
+            movie_id INTEGER PRIMARY KEY,
+            imdb_id TEXT,
+            tmdb_id INTEGER,
+            title TEXT NOT NULL,
+            poster_path TEXT
+        );
+        CREATE TRIGGER IF NOT EXISTS movie_cards_insert AFTER INSERT ON movies BEGIN
+            INSERT OR REPLACE INTO movie_cards (movie_id, imdb_id, tmdb_id, title, poster_path)
+            VALUES (new.id, new.imdb_id, new.tmdb_id, new.title, new.poster_path);
+        END;
+        -- A plain UPDATE: an OR REPLACE in a trigger body takes the outer statement's conflict
+        -- policy, so it failed when fired by TriggerWriter's upsert on an existing movie
+        DROP TRIGGER IF EXISTS movie_cards_update;
+        CREATE TRIGGER movie_cards_update AFTER UPDATE OF imdb_id, tmdb_id, title, poster_path ON movies BEGIN
+            UPDATE movie_cards
+            SET imdb_id = new.imdb_id, tmdb_id = new.tmdb_id, title = new.title, poster_path = new.poster_path
+            WHERE movie_id = new.id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS movie_cards_delete AFTER DELETE ON movies BEGIN
+            DELETE FROM movie_cards WHERE movie_id = old.id;
+        END;
+    """)
+    if not has_cards:
+        conn.execute("""
+            INSERT INTO movie_cards (movie_id, imdb_id, tmdb_id, title, poster_path)
+            SELECT id, imdb_id, tmdb_id, title, poster_path FROM movies
+        """)
+
+    # Change counters the web process polls to invalidate its in-memory caches.
+    # trigger_definitions is bumped by triggers so manual category edits count too;
+    # catalogue is bumped by the ingestion path after it writes movies or triggers.
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        );
+        INSERT OR IGNORE INTO data_versions (name) VALUES ('trigger_definitions'), ('catalogue');
+        CREATE TRIGGER IF NOT EXISTS trigger_definitions_version_insert AFTER INSERT ON trigger_definitions BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE name = 'trigger_definitions';
+        END;
+        CREATE TRIGGER IF NOT EXISTS trigger_definitions_version_update AFTER UPDATE ON trigger_definitions BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE name = 'trigger_definitions';
+        END;
+        CREATE TRIGGER IF NOT EXISTS trigger_definitions_version_delete AFTER DELETE ON trigger_definitions BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE name = 'trigger_definitions';
+        END;
+    """)
+
+    # Per-title progress for the ingestion pipeline (see IngestPipeline)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_jobs (
+            title TEXT PRIMARY KEY,
+            status TEXT NOT NULL DEFAULT 'pending',
+            stage TEXT,
+            current_stage TEXT,
+            data TEXT,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+
+def get_version(conn, name):
+    """Reads a change counter from data_versions."""
+    row = conn.execute("SELECT version FROM data_versions WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else 0
+
+
+def bump_version(cursor, name):
+    """Increments a change counter; call inside the writing transaction."""
+    cursor.execute("UPDATE data_versions SET version = version + 1 WHERE name = ?", (name,))
+
+
+def connect_writer(db_path=DB_PATH, check_same_thread=True):
+    """
+    Opens a connection for ingestion and maintenance writes.
+
+    Waits on the write lock instead of failing with "database is locked" when
+    another writer is mid-transaction.
+    """
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=check_same_thread)
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+
+class ReadConnectionPool:
+    """
+    Pool of read-only connections shared by the web routes.
+
+    Connections are reused across requests, which also keeps each connection's
+    prepared statement cache warm.
+    """
+    def __init__(self, db_path=DB_PATH, size=8):
+        self.db_path = db_path
+        self.size = size
+        self.idle = queue.LifoQueue()
+
+    def acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, conn):
+        if self.idle.qsize() < self.size:
+            self.idle.put(conn)
+        else:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            f"file:{self.db_path}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute(f"PRAGMA mmap_size = {READ_MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size = -{READ_CACHE_KIB}")
+        return conn
+
+
+def movie_info_from_tmdb(details, director=None):
+    """
+    Extracts the display columns stored on movies from a TMDB details response.
+
+    Parameters:
+        details (dict): TMDB /movie/{id} response
+        director (str): Director name, if known
+
+    Returns:
+        dict: Column name -> value for the MOVIE_COLUMNS fields
+    """
+    release_date = details.get("release_date") or ""
+    return {
+        "tmdb_id": details.get("id"),
+        "poster_path": details.get("poster_path"),
+        "release_year": int(release_date[:4]) if release_date[:4].isdigit() else None,
+        "genres": ", ".join(genre["name"] for genre in details.get("genres", [])),
+        "overview": details.get("overview"),
+        "director": director,
+    }
+
+
+def update_movie_info(cursor, movie_id, movie_info):
+    """Writes the display columns for one movies row."""
+    cursor.execute("""
+        UPDATE movies
+        SET tmdb_id = ?, poster_path = ?, release_year = ?, genres = ?, overview = ?, director = ?
+        WHERE id = ?
+    """, (*(movie_info.get(column) for column in MOVIE_COLUMNS), movie_id))
+
+
+def mask_to_blob(mask):
+    """Encodes a trigger bitset (Python int) for the movies.trigger_mask column."""
+    return mask.to_bytes((mask.bit_length() + 7) // 8 or 1, MASK_BYTE_ORDER)
+
+
+def blob_to_mask(blob):
+    """Decodes a movies.trigger_mask value back into a Python int."""
+    return int.from_bytes(blob, MASK_BYTE_ORDER) if blob else 0
+
+
+def mask_for(trigger_ids):
+    """Builds a bitset with one bit per trigger_definitions.id."""
+    mask = 0
+    for trigger_id in trigger_ids:
+        mask |= 1 << trigger_id
+    return mask
+
+
+def refresh_trigger_masks(cursor, movie_ids=None):
+    """
+    Rebuilds movies.trigger_mask from the triggers table.
+
+    Parameters:
+        cursor (sqlite3.Cursor): Cursor on a writable connection
+        movie_ids (list): Movies to rebuild, or None for the whole catalogue
+    """
+    if movie_ids is None:
+        cursor.execute("SELECT id FROM movies")
+        movie_ids = [row[0] for row in cursor.fetchall()]
+
+    masks = {movie_id: 0 for movie_id in movie_ids}
+    for start in range(0, len(movie_ids), 500):
+        batch = movie_ids[start:start + 500]
+        placeholders = ",".join("?" for _ in batch)
+        cursor.execute(f"""
+            SELECT movie_id, trigger_id FROM triggers
+            WHERE value = 1 AND movie_id IN ({placeholders})
+        """, batch)
+        for movie_id, trigger_id in cursor.fetchall():
+            masks[movie_id] |= 1 << trigger_id
+
+    cursor.executemany(
+        "UPDATE movies SET trigger_mask = ? WHERE id = ?",
+        [(mask_to_blob(mask), movie_id) for movie_id, mask in masks.items()]
+    )
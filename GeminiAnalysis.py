@@ -1,26 +1,138 @@
 import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from ScriptChunker import ScriptChunker, estimate_tokens
 from sourcing.ScriptScraper import ScriptScraper
 from sourcing.SumScraper import SumScraper
 from google import genai
 from google.genai import types
 import json
+import re
+import sqlite3
+from Database import DB_PATH
+from Metrics import outbound
 
+MODEL = "gemini-2.5-pro-preview-03-25"
 
-# Parses response to only have JSON. Could be fixed using schema, will be done in next version.
+# Few-shot examples: PDF script plus the Wikipedia lookup arguments for each film
+EXAMPLE_SCRIPTS = {
+    "Joker": "sourcing/ExampleScripts/joker_2019.pdf",
+    "Whiplash": "sourcing/ExampleScripts/whiplash_2014.pdf",
+    "Midsommar": "sourcing/ExampleScripts/midsommar_2019.pdf"
+}
+EXAMPLE_SUMMARY_ARGS = {
+    "Joker": ("Joker", "Todd Phillips", "tt7286456"),
+    "Whiplash": ("Whiplash", "Damien Chazelle", "tt258280"),
+    "Midsommar": ("Midsommar", "Ari Aster", "tt8772262")
+}
+
+# Bump when the few-shot prompt template below changes so cached prompts are rebuilt
+FEW_SHOT_PROMPT_VERSION = 1
+PROMPT_CACHE_DIR = os.getenv("PROMPT_CACHE_DIR", ".cache/prompts")
+CONTEXT_CACHE_TTL = "86400s"
+
+# Scripts are analysed in windows of this many tokens, in parallel, up to a per-film budget
+ANALYSIS_WINDOW_TOKENS = int(os.getenv("ANALYSIS_WINDOW_TOKENS", 30000))
+ANALYSIS_OVERLAP_TOKENS = int(os.getenv("ANALYSIS_OVERLAP_TOKENS", 500))
+ANALYSIS_TOKEN_BUDGET = int(os.getenv("ANALYSIS_TOKEN_BUDGET", 120000))
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", 4))
+
+# Extra requests per window for triggers missing from a truncated or malformed response
+ANALYSIS_RETRIES = int(os.getenv("ANALYSIS_RETRIES", 2))
+# A completed "trigger": true/false (or 1/0) pair inside the streamed JSON object
+TRIGGER_PAIR_RE = re.compile(r'"((?:[^"\\]|\\.)*)"\s*:\s*(true|false|1|0)\b')
+
+
+# Responses follow a schema built from trigger_definitions and are parsed as they stream (see TriggerStreamParser).
 class GeminiAnalysis:
-    def __init__(self):
+    def __init__(self, scheduler=None):
+        # Optional GeminiScheduler, consulted before every model request (a film may need several)
+        self.scheduler = scheduler
         self.client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+        self.few_shot_prompt = None
+        self.few_shot_key = None
+        self.cached_content = None
+        # Set once creating the context cache fails, so later requests skip straight to the inline prompt
+        self.context_cache_failed = False
+        self.trigger_names = None
+        self.chunker = ScriptChunker(ANALYSIS_WINDOW_TOKENS, ANALYSIS_OVERLAP_TOKENS)
+
+    def get_few_shot_prompt(self):
+        """
+        Returns the few-shot system prompt, building it at most once per input set.
+
+        The prompt is keyed by a hash of the example PDFs, the Wikipedia lookup
+        arguments and FEW_SHOT_PROMPT_VERSION, and persisted under PROMPT_CACHE_DIR
+        so later runs skip the PDF parsing and Wikipedia round-trips.
+
+        Returns:
+            str: The few-shot system prompt.
+        """
+        if self.few_shot_prompt is not None:
+            return self.few_shot_prompt
+
+        digest = hashlib.sha256()
+        digest.update(f"{FEW_SHOT_PROMPT_VERSION}|{json.dumps(EXAMPLE_SUMMARY_ARGS, sort_keys=True)}".encode())
+        for movie, path in sorted(EXAMPLE_SCRIPTS.items()):
+            with open(path, "rb") as pdf_file:
+                digest.update(movie.encode())
+                digest.update(hashlib.sha256(pdf_file.read()).digest())
+        self.few_shot_key = digest.hexdigest()
 
-    def RunAnalysis(self, movie_title, wikipedia_summary, movie_script):
+        cache_path = os.path.join(PROMPT_CACHE_DIR, f"few_shot_{self.few_shot_key}.txt")
+        if os.path.exists(cache_path):
+            with open(cache_path, encoding="utf-8") as cache_file:
+                self.few_shot_prompt = cache_file.read()
+            return self.few_shot_prompt
+
+        self.few_shot_prompt = self._build_few_shot_prompt()
+        os.makedirs(PROMPT_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as cache_file:
+            cache_file.write(self.few_shot_prompt)
+        os.replace(tmp_path, cache_path)
+        return self.few_shot_prompt
+
+    def get_cached_content(self):
+        """
+        Returns the name of a Gemini context cache holding the few-shot prompt.
+
+        Reuses a live cache created by an earlier run for the same prompt hash.
+        Returns None when context caching is unavailable (e.g. unsupported model
+        or prompt below the minimum cacheable size), in which case the prompt is
+        sent as a plain system instruction. A failure is remembered for the life
+        of this instance, so it costs the list/create round-trips only once.
+        """
+        if self.cached_content is not None or self.context_cache_failed:
+            return self.cached_content
+
+        prompt = self.get_few_shot_prompt()
+        display_name = f"streamsafe-few-shot-{self.few_shot_key[:16]}"
+        try:
+            for cache in self.client.caches.list():
+                if cache.display_name == display_name and cache.model.endswith(MODEL):
+                    self.cached_content = cache.name
+                    return self.cached_content
+
+            cache = self.client.caches.create(
+                model=MODEL,
+                config=types.CreateCachedContentConfig(
+                    display_name=display_name,
+                    system_instruction=prompt,
+                    ttl=CONTEXT_CACHE_TTL)
+            )
+            self.cached_content = cache.name
+        except Exception as e:
+            print(f"Context caching unavailable, sending few-shot prompt inline: {e}")
+            self.context_cache_failed = True
+        return self.cached_content
+
+    def _build_few_shot_prompt(self):
         scripts = ScriptScraper()
         summary = SumScraper()
-        example_scripts = {
-            "Joker": "sourcing/ExampleScripts/joker_2019.pdf",
-            "Whiplash": "sourcing/ExampleScripts/whiplash_2014.pdf",
-            "Midsommar": "sourcing/ExampleScripts/midsommar_2019.pdf"
-        }
-        scripts_text = {movie: scripts.pdf_to_text(path) for movie, path in example_scripts.items()}
-        few_shot_prompt = f"""
+        scripts_text = {movie: scripts.pdf_to_text(path) for movie, path in EXAMPLE_SCRIPTS.items()}
+        summaries = dict(zip(EXAMPLE_SUMMARY_ARGS, summary.get_wikipedia_summaries(list(EXAMPLE_SUMMARY_ARGS.values()))))
+        return f"""
             You are an AI trained to detect emotional triggers in movies to assist users with PTSD and trauma sensitivity. 
             You have access to general movie knowledge, including themes, events, and content warnings from your pre-trained knowledge. 
             Use both your **internal knowledge of films** and the provided **Wikipedia summary & script** to accurately determine whether specific triggers appear in the film. 
@@ -41,7 +153,7 @@ class GeminiAnalysis:
             ### **Example 1**
             Movie: Joker (2019)
             Wikipedia Summary:
-            {summary.get_wikipedia_summary("Joker", "Todd Phillips", "tt7286456")}
+            {summaries['Joker']}
 
             Script:
             {scripts_text['Joker']}
@@ -57,7 +169,7 @@ class GeminiAnalysis:
             ### **Example 2**
             Movie: Whiplash (2014)
             Wikipedia Summary:
-            {summary.get_wikipedia_summary("Whiplash", "Damien Chazelle", "tt258280")}
+            {summaries['Whiplash']}
 
             Script:
             {scripts_text['Whiplash']}
@@ -73,7 +185,7 @@ class GeminiAnalysis:
             ### **Example 3**
             Movie: Midsommar (2019)
             Wikipedia Summary:
-            {summary.get_wikipedia_summary("Midsommar", "Ari Aster", "tt8772262")}
+            {summaries['Midsommar']}
 
             Script:
             {scripts_text['Midsommar']}
@@ -85,38 +197,200 @@ class GeminiAnalysis:
             }}
             ---
         """
-        user_prompt = f"""
+
+    def RunAnalysis(self, movie_title, wikipedia_summary, movie_script, triggers=None):
+        """
+        Detects triggers for one movie.
+
+        The script is split into scene-aligned windows of ANALYSIS_WINDOW_TOKENS,
+        each analysed in parallel alongside the Wikipedia summary, and the per-window
+        results are merged: a trigger is present if any window marks it present.
+        Windows beyond ANALYSIS_TOKEN_BUDGET script tokens per film are not sent.
+        When `triggers` is given (e.g. those KeywordPrescreen could not settle),
+        the model is only asked about those; otherwise about every trigger_definitions name.
+
+        Returns:
+            dict: Trigger name -> 0/1, or None if any window could not be analysed.
+        """
+        windows = self.chunker.chunk(movie_script or "") or [""]
+        kept, used = [], 0
+        for window in windows:
+            tokens = self.chunker.count_tokens(window)
+            if kept and used + tokens > ANALYSIS_TOKEN_BUDGET:
+                break
+            kept.append(window)
+            used += tokens
+        if len(kept) < len(windows):
+            print(f"{movie_title}: token budget reached, analysing {len(kept)} of {len(windows)} script windows")
+
+        triggers = list(triggers) if triggers is not None else self.get_trigger_names()
+        jobs = [(movie_title, wikipedia_summary, window, i + 1, len(kept), triggers) for i, window in enumerate(kept)]
+        if len(jobs) == 1:
+            results = [self._analyse(*jobs[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(ANALYSIS_WORKERS, len(jobs))) as pool:
+                results = list(pool.map(lambda job: self._analyse(*job), jobs))
+
+        if any(result is None for result in results):
+            return None
+        return self._merge(results)
+
+    def get_trigger_names(self):
+        """Returns every trigger_definitions name, read once per instance."""
+        if self.trigger_names is None:
+            conn = sqlite3.connect(DB_PATH)
+            self.trigger_names = [name for (name,) in conn.execute("SELECT name FROM trigger_definitions ORDER BY id")]
+            conn.close()
+        return self.trigger_names
+
+    def _user_prompt(self, movie_title, wikipedia_summary, script_window, part, parts, triggers=None):
+        script_label = "Script:" if parts == 1 else f"Script (part {part} of {parts}):"
+        trigger_scope = ""
+        if triggers:
+            trigger_scope = "Only decide these triggers and return exactly these keys: " + json.dumps(list(triggers))
+        return f"""
             **ONLY use the following script and wikipedia summary in determining the triggers of {movie_title}.** Previous scripts and summaries are merely there for examples.
             **Now Analyze This Movie** 
             Movie: {movie_title}
             Wikipedia Summary:
             {wikipedia_summary}
 
-            Script:
-            {movie_script}
+            {script_label}
+            {script_window}
 
             Triggers:
+            {trigger_scope}
 
             **Return only a valid JSON object. Do not guess. Only mark a trigger as present if it is clear in the script or summary.
-            Once you havegenerated your json, check your answers and cross reference with this script: {movie_script} and this summary: {wikipedia_summary}. For any triggers that do not explicitly show up in these two sources, but that you have marked as '1',
+            Once you have generated your json, check your answers and cross reference with the script and summary above. For any triggers that do not explicitly show up in these two sources, but that you have marked as '1',
             correct them to '0'. Return only the final generated JSON trigger list.
             """
-        response = self.client.models.generate_content(
-                model="gemini-2.5-pro-preview-03-25",
+
+    def _analyse(self, movie_title, wikipedia_summary, script_window, part, parts, triggers):
+        # Keys that came back are kept; only the ones missing from a cut-off or malformed response are asked again
+        found = {}
+        for attempt in range(1 + ANALYSIS_RETRIES):
+            missing = [trigger for trigger in triggers if trigger not in found]
+            if not missing:
+                break
+            if attempt:
+                print(f"{movie_title}: retrying {len(missing)} missing triggers (part {part} of {parts})")
+            scope = missing if attempt or missing != self.get_trigger_names() else None
+            prompt = self._user_prompt(movie_title, wikipedia_summary, script_window, part, parts, scope)
+            found.update(self._stream_triggers(prompt, missing))
+
+        missing = [trigger for trigger in triggers if trigger not in found]
+        if missing:
+            print(f"{movie_title}: no answer for {len(missing)} triggers after {1 + ANALYSIS_RETRIES} attempts")
+            return None
+        return {trigger: found[trigger] for trigger in triggers}
+
+    def _stream_triggers(self, user_prompt, triggers):
+        parser = TriggerStreamParser()
+        response_schema = self._response_schema(triggers)
+        while True:
+            call_id = None
+            if self.scheduler:
+                call_id = self.scheduler.acquire(self._estimate_tokens(user_prompt, triggers))
+            usage = None
+            try:
+                with outbound("gemini") as call:
+                    for chunk in self._generate_stream(user_prompt, response_schema):
+                        parser.feed(chunk.text or "")
+                        usage = chunk.usage_metadata or usage
+                    call["outcome"] = "ok"
+            except Exception as e:
+                if self.scheduler and is_rate_limit_error(e) and not parser.triggers:
+                    # Nothing was answered; wait out the limit and send the same request again
+                    print("Gemini rate limited, backing off:", e)
+                    self.scheduler.rate_limited(call_id, e)
+                    continue
+                print("Gemini request failed:", e)
+            if call_id is not None and usage is not None and usage.total_token_count:
+                self.scheduler.settle(call_id, usage.total_token_count)
+            break
+        wanted = set(triggers)
+        return {trigger: value for trigger, value in parser.triggers.items() if trigger in wanted}
+
+    def _estimate_tokens(self, user_prompt, triggers):
+        # Few-shot examples count against the quota too, cached or not; about 10 output tokens per trigger
+        return estimate_tokens(self.get_few_shot_prompt()) + estimate_tokens(user_prompt) + 10 * len(triggers)
+
+    @staticmethod
+    def _response_schema(triggers):
+        # One required boolean per trigger, so the model cannot drop, rename or invent keys
+        return types.Schema(
+            type=types.Type.OBJECT,
+            properties={trigger: types.Schema(type=types.Type.BOOLEAN) for trigger in triggers},
+            required=list(triggers)
+        )
+
+    @staticmethod
+    def _merge(results):
+        # OR across windows: a trigger seen in any part of the script is present in the film
+        merged = {}
+        for result in results:
+            for trigger, value in result.items():
+                merged[trigger] = max(merged.get(trigger, 0), int(value))
+        return merged
+
+    def _generate_stream(self, user_prompt, response_schema):
+        cached_content = self.get_cached_content()
+        if cached_content:
+            try:
+                stream = iter(self.client.models.generate_content_stream(
+                        model=MODEL,
+                        config=types.GenerateContentConfig(
+                            cached_content=cached_content,
+                            response_mime_type='application/json',
+                            response_schema=response_schema),
+                        contents=user_prompt
+                ))
+                first = next(stream, None)
+            except Exception as e:
+                # Cache expired or was deleted; fall back to the inline prompt and recreate it next call
+                print(f"Cached content request failed, retrying inline: {e}")
+                self.cached_content = None
+            else:
+                if first is not None:
+                    yield first
+                yield from stream
+                return
+
+        yield from self.client.models.generate_content_stream(
+                model=MODEL,
                 config=types.GenerateContentConfig(
-                    system_instruction=few_shot_prompt,
-                    response_mime_type='application/json'),
+                    system_instruction=self.get_few_shot_prompt(),
+                    response_mime_type='application/json',
+                    response_schema=response_schema),
                 contents=user_prompt
         )
-        json_start = response.text.find('{')
-        json_end = response.text.find('}')
 
-        json_cleaned = response.text[json_start:json_end+1]
 
-        try:
-            trigger_dict = json.loads(json_cleaned)
-            return trigger_dict
-        except json.JSONDecodeError as e:
-            print("Failed to decode JSON:", e)
-            print("Cleaned text:", json_cleaned)
-            return None
\ No newline at end of file
+def is_rate_limit_error(error):
+    """True for a 429 / RESOURCE_EXHAUSTED error from the Gemini API."""
+    return getattr(error, "code", None) == 429 or "RESOURCE_EXHAUSTED" in str(error)
+
+
+class TriggerStreamParser:
+    """
+    Collects "trigger": value pairs from a flat JSON object while it streams in.
+
+    Pairs are taken as soon as they are complete, so a response that is cut off
+    or malformed part-way still yields everything before the break.
+    """
+    def __init__(self):
+        self.buffer = ""
+        self.position = 0
+        self.triggers = {}
+
+    def feed(self, text):
+        self.buffer += text
+        for match in TRIGGER_PAIR_RE.finditer(self.buffer, self.position):
+            try:
+                trigger = json.loads(f'"{match.group(1)}"')
+            except json.JSONDecodeError:
+                trigger = match.group(1)
+            self.triggers[trigger] = 1 if match.group(2) in ("true", "1") else 0
+            self.position = match.end()
+        return self.triggers
@@ -0,0 +1,207 @@
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python < 3.9: count quota days in UTC
+    ZoneInfo = None
+
+# Free-tier style limits; 0 disables a limit
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", 5))
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", 250000))
+GEMINI_RPD = int(os.getenv("GEMINI_RPD", 25))
+GEMINI_TPD = int(os.getenv("GEMINI_TPD", 0))
+
+# Daily quotas reset at midnight Pacific time
+GEMINI_QUOTA_TZ = os.getenv("GEMINI_QUOTA_TZ", "America/Los_Angeles")
+
+# Exponential backoff after a 429, in seconds
+BACKOFF_START = 10
+BACKOFF_MAX = 600
+
+
+class GeminiScheduler:
+    """
+    Admits Gemini requests only while they fit the per-minute and per-day quotas.
+
+    Every admitted request is logged with its token count in a sidecar SQLite
+    file, so the limits hold across restarts and across processes sharing the
+    file. A caller that would exceed a limit sleeps until the window frees up;
+    once the daily quota is spent that means sleeping until it resets, after
+    which the run carries on by itself. A 429 from the API pauses every caller
+    with exponential backoff (or until the reset, for daily limits).
+    """
+    def __init__(self, db_path="gemini_quota.db", rpm=GEMINI_RPM, tpm=GEMINI_TPM, rpd=GEMINI_RPD, tpd=GEMINI_TPD,
+                 timezone=GEMINI_QUOTA_TZ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.rpd = rpd
+        self.tpd = tpd
+        self.tz = None
+        if ZoneInfo is not None:
+            try:
+                self.tz = ZoneInfo(timezone)
+            except ZoneInfoNotFoundError:
+                print(f"Unknown time zone '{timezone}', counting Gemini quota days in UTC")
+        self.lock = threading.Lock()
+        self.paused_until = 0
+        self.backoff = BACKOFF_START
+
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS gemini_calls (
+                id INTEGER PRIMARY KEY,
+                at REAL NOT NULL,
+                day TEXT NOT NULL,
+                tokens INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_gemini_calls_at ON gemini_calls(at);
+            CREATE INDEX IF NOT EXISTS idx_gemini_calls_day ON gemini_calls(day);
+        """)
+        self.conn.execute("DELETE FROM gemini_calls WHERE at < ?", (time.time() - 7 * 24 * 3600,))
+        self.conn.commit()
+
+    def acquire(self, tokens):
+        """
+        Blocks until a request of about `tokens` tokens fits every limit, then logs it.
+
+        Args:
+            tokens (int): Estimated input plus output tokens for the request.
+
+        Returns:
+            int: Call id to pass to settle() or rate_limited().
+        """
+        announced = False
+        while True:
+            with self.lock:
+                wait = self._wait_time(tokens)
+                if wait <= 0:
+                    now = time.time()
+                    cursor = self.conn.execute(
+                        "INSERT INTO gemini_calls (at, day, tokens) VALUES (?, ?, ?)",
+                        (now, self._day(now), tokens)
+                    )
+                    self.conn.commit()
+                    return cursor.lastrowid
+
+            if wait > 60 and not announced:
+                resume = datetime.fromtimestamp(time.time() + wait).strftime("%Y-%m-%d %H:%M")
+                print(f"Gemini quota exhausted; waiting until {resume} to continue")
+                announced = True
+            time.sleep(min(wait, 300))
+
+    def settle(self, call_id, tokens):
+        """Replaces a call's estimated token count with the count the API reported."""
+        with self.lock:
+            self.conn.execute("UPDATE gemini_calls SET tokens = ? WHERE id = ?", (tokens, call_id))
+            self.conn.commit()
+            self.backoff = BACKOFF_START
+
+    def rate_limited(self, call_id=None, error=None):
+        """
+        Records a 429 and pauses all callers.
+
+        Args:
+            call_id (int, optional): The rejected call; its tokens were not consumed.
+            error (Exception, optional): The API error, used to tell daily from per-minute limits.
+        """
+        with self.lock:
+            now = time.time()
+            if call_id is not None:
+                self.conn.execute("UPDATE gemini_calls SET tokens = 0 WHERE id = ?", (call_id,))
+                self.conn.commit()
+            if error is not None and "PerDay" in str(error):
+                self.paused_until = max(self.paused_until, self._next_reset(now))
+            else:
+                delay = self.backoff * (1 + random.random() / 10)
+                self.backoff = min(self.backoff * 2, BACKOFF_MAX)
+                self.paused_until = max(self.paused_until, now + delay)
+
+    def get_usage(self):
+        """Returns requests and tokens used in the last minute and in the current quota day."""
+        now = time.time()
+        with self.lock:
+            minute = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tokens), 0) FROM gemini_calls WHERE at > ?", (now - 60,)
+            ).fetchone()
+            day = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tokens), 0) FROM gemini_calls WHERE day = ?", (self._day(now),)
+            ).fetchone()
+        return {"requests_minute": minute[0], "tokens_minute": minute[1],
+                "requests_day": day[0], "tokens_day": day[1]}
+
+    def _wait_time(self, tokens):
+        now = time.time()
+        wait = self.paused_until - now
+
+        requests_day, tokens_day = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(tokens), 0) FROM gemini_calls WHERE day = ?", (self._day(now),)
+        ).fetchone()
+        if (self.rpd and requests_day + 1 > self.rpd) or (self.tpd and tokens_day + tokens > self.tpd):
+            return max(wait, self._next_reset(now) - now)
+
+        calls = self.conn.execute(
+            "SELECT at, tokens FROM gemini_calls WHERE at > ? ORDER BY at", (now - 60,)
+        ).fetchall()
+        # Drop the oldest calls until this one fits; it can go once the last dropped call leaves the window
+        used_tokens = sum(call_tokens for _, call_tokens in calls)
+        dropped = 0
+        while dropped < len(calls) and (
+            (self.rpm and len(calls) - dropped + 1 > self.rpm) or
+            (self.tpm and used_tokens + tokens > self.tpm and tokens <= self.tpm)
+        ):
+            used_tokens -= calls[dropped][1]
+            dropped += 1
+        if dropped:
+            wait = max(wait, calls[dropped - 1][0] + 60 - now)
+        return wait
+
+    def _local(self, timestamp):
+        return datetime.fromtimestamp(timestamp, self.tz) if self.tz else datetime.utcfromtimestamp(timestamp)
+
+    def _day(self, timestamp):
+        return self._local(timestamp).strftime("%Y-%m-%d")
+
+    def _next_reset(self, timestamp):
+        local = self._local(timestamp)
+        midnight = (local + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        if self.tz:
+            return midnight.timestamp()
+        return timestamp + (midnight - local).total_seconds()
+
+
+def prioritise(titles, demand):
+    """
+    Orders titles so the ones users have searched for come first.
+
+    Args:
+        titles (iterable): Movie titles in their original order.
+        demand (dict): Search query -> number of searches (see SearchDemand.counts).
+
+    Returns:
+        list: Titles by descending demand; ties keep their original order.
+    """
+    queries = {}
+    for query, count in demand.items():
+        query = normalise_title(query)
+        if len(query) >= 3:
+            queries[query] = queries.get(query, 0) + count
+
+    # Only a query inside the title counts: the reverse would let short titles ("It", "Up") match most queries
+    def score(title):
+        title = normalise_title(title)
+        return sum(count for query, count in queries.items() if query in title)
+
+    titles = list(titles)
+    scores = {title: score(title) for title in set(titles)}
+    return sorted(titles, key=lambda title: -scores[title])
+
+
+# Lowercase, with punctuation dropped and whitespace collapsed, so "Spider-Man:" and "spider man" compare equal
+def normalise_title(text):
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
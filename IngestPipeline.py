@@ -0,0 +1,208 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from Database import DB_PATH, connect_writer
+from Metrics import INGEST_STAGE_SECONDS
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter shared by every worker calling one service.
+
+    Allows bursts of up to `capacity` calls, refilled at `rate` calls per second.
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Blocks until `tokens` calls are allowed."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class SkipJob(Exception):
+    """Raised by a stage when a title cannot be processed (e.g. no script exists)."""
+
+
+class Stage:
+    """
+    One step of the ingestion pipeline.
+
+    Args:
+        name (str): Stage name recorded in ingest_jobs.
+        func (callable): Takes the job dict and returns a dict of fields to merge into it.
+        workers (int): Size of this stage's worker pool.
+        limiter (TokenBucket, optional): Acquired once before each call.
+        durable (bool): Whether this stage's output is persisted, so reruns can resume after it.
+            Non-durable output (e.g. full script text) is kept in memory only.
+    """
+    def __init__(self, name, func, workers=1, limiter=None, durable=True):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.limiter = limiter
+        self.durable = durable
+
+
+class IngestPipeline:
+    """
+    Runs titles through a sequence of stages, each with its own bounded worker pool.
+
+    A title moves to the next stage's pool as soon as it finishes the current one,
+    so network-bound scraping for some titles overlaps with model calls for others.
+    Progress is recorded per title in the ingest_jobs table: completed titles are
+    skipped on rerun, and unfinished ones resume after their last durable stage.
+    """
+    def __init__(self, stages, db_path=DB_PATH):
+        self.stages = stages
+        self.db_path = db_path
+        self.pools = [
+            ThreadPoolExecutor(max_workers=stage.workers, thread_name_prefix=f"ingest-{stage.name}")
+            for stage in stages
+        ]
+        self.conn = connect_writer(db_path, check_same_thread=False)
+        self.conn_lock = threading.Lock()
+        self.transient_keys = set()  # output of non-durable stages, never written to ingest_jobs
+        self.outstanding = 0
+        self.finished = threading.Condition()
+        self.counts = {"done": 0, "skipped": 0, "failed": 0}
+
+    def run(self, titles, retry_skipped=False):
+        """
+        Processes titles until every one is done, skipped or failed.
+
+        Args:
+            titles (iterable): Movie titles; duplicates are processed once.
+            retry_skipped (bool): Also retry titles previously skipped (e.g. no script found).
+
+        Returns:
+            dict: Count of titles per final status for this run.
+        """
+        stage_index = {stage.name: i for i, stage in enumerate(self.stages)}
+        jobs = self._load_jobs()
+        finished_statuses = {"done", "skipped"} if not retry_skipped else {"done"}
+
+        for title in dict.fromkeys(titles):
+            row = jobs.get(title)
+            if row and row["status"] in finished_statuses:
+                continue
+
+            job = {"title": title}
+            start = 0
+            if row and row["stage"] in stage_index:
+                job.update(row["data"])
+                start = stage_index[row["stage"]] + 1
+            else:
+                self._save(title, "pending", None, None, {})
+
+            if start >= len(self.stages):
+                self._save(title, "done", row["stage"], None, row["data"])
+                continue
+
+            with self.finished:
+                self.outstanding += 1
+            self.pools[start].submit(self._run_stage, start, job, row["stage"] if row else None)
+
+        with self.finished:
+            while self.outstanding:
+                self.finished.wait()
+
+        for pool in self.pools:
+            pool.shutdown()
+        self.conn.close()
+        return dict(self.counts)
+
+    def _run_stage(self, index, job, durable_stage):
+        stage = self.stages[index]
+        title = job["title"]
+        try:
+            self._save(title, "running", durable_stage, stage.name, None)
+            if stage.limiter:
+                stage.limiter.acquire()
+            started = time.perf_counter()
+            outcome = "failed"
+            try:
+                updates = stage.func(job) or {}
+                outcome = "done"
+            except SkipJob:
+                outcome = "skipped"
+                raise
+            finally:
+                # Time in the stage itself; rate-limiter waits are left out
+                INGEST_STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage.name, outcome=outcome)
+            job.update(updates)
+            if not stage.durable:
+                with self.conn_lock:
+                    self.transient_keys.update(updates)
+            else:
+                durable_stage = stage.name
+                self._save(title, "running", durable_stage, stage.name, self._durable_data(job))
+        except SkipJob as e:
+            print(f"Skipping '{title}' at {stage.name}: {e}")
+            self._finish(title, "skipped", durable_stage, stage.name, str(e))
+            return
+        except Exception as e:
+            print(f"Error processing '{title}' at {stage.name}: {e}")
+            self._finish(title, "failed", durable_stage, stage.name, str(e))
+            return
+
+        if index + 1 < len(self.stages):
+            self.pools[index + 1].submit(self._run_stage, index + 1, job, durable_stage)
+        else:
+            self._finish(title, "done", durable_stage, stage.name, None)
+
+    def _durable_data(self, job):
+        with self.conn_lock:
+            transient = set(self.transient_keys)
+        return {key: value for key, value in job.items() if key not in transient and key != "title"}
+
+    def _finish(self, title, status, durable_stage, current_stage, error):
+        try:
+            self._save(title, status, durable_stage, current_stage, None, error)
+        except Exception as e:
+            # The job stays 'running' in ingest_jobs and resumes on the next run
+            print(f"Failed to record '{title}' as {status}: {e}")
+        finally:
+            # Always release the job, or run() would wait on it forever
+            with self.finished:
+                self.counts[status] += 1
+                self.outstanding -= 1
+                self.finished.notify_all()
+
+    def _load_jobs(self):
+        with self.conn_lock:
+            rows = self.conn.execute("SELECT title, status, stage, data FROM ingest_jobs").fetchall()
+        return {
+            title: {"status": status, "stage": stage, "data": json.loads(data) if data else {}}
+            for title, status, stage, data in rows
+        }
+
+    def _save(self, title, status, stage, current_stage, data, error=None):
+        with self.conn_lock:
+            self.conn.execute("""
+                INSERT INTO ingest_jobs (title, status, stage, current_stage, data, error, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(title) DO UPDATE SET
+                    status = excluded.status,
+                    stage = excluded.stage,
+                    current_stage = excluded.current_stage,
+                    data = COALESCE(excluded.data, ingest_jobs.data),
+                    error = excluded.error,
+                    attempts = ingest_jobs.attempts + (excluded.status = 'running' AND ingest_jobs.status != 'running'),
+                    updated_at = excluded.updated_at
+            """, (title, status, stage, current_stage, json.dumps(data) if data is not None else None,
+                  error, time.time()))
+            self.conn.commit()
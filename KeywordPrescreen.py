@@ -0,0 +1,495 @@
+import re
+import sys
+import threading
+
+# Lexical evidence for triggers that can be settled from the text alone.
+#   requires: vocabulary the trigger cannot occur without (none found anywhere -> 0)
+#   confirms: phrases that only appear when the trigger occurs (enough hits -> 1)
+# A false "present" hides a film from everyone filtering on that trigger, so confirms leave out words with
+# common idiomatic or expletive uses ("bloody", "beat a dead horse", "blew up at", "stabbed in the back");
+# those stay required vocabulary only and the model decides.
+# Triggers left out here (themes, misrepresentation, context-dependent language, ...) always go to the model.
+#
+# Phrases are matched word by word, case-insensitively:
+#   "dead dog|puppy"   "|" separates alternatives for one word
+#   "vomit*"           a trailing "*" matches any word starting with the stem
+#   "int|ext * hospital*"   a lone "*" matches any single word
+LEXICON = {
+    "a cat dies": {
+        "requires": ["cat|cats|kitten|kittens|kitty|kitties"],
+        "confirms": ["dead cat|kitten", "cat|kitten corpse|carcass", "kill|kills the cat|kitten", "killed the kitten"],
+    },
+    "a dog dies": {
+        "requires": ["dog|dogs|puppy|puppies|hound|hounds|mutt|mutts"],
+        "confirms": ["dead dog|puppy", "dog|puppy corpse|carcass", "kill|kills|killed|shoots|shot the dog"],
+    },
+    "a horse dies": {
+        "requires": ["horse*|pony|ponies|stallion*|mare|mares|foal*|colt|colts"],
+        "confirms": ["horse corpse|carcass", "shoots|shot the horse"],
+    },
+    "a plane crashes": {
+        "requires": ["plane|planes|airplane*|aircraft|airliner*|jet|jets|cockpit"],
+        "confirms": ["plane crash*", "plane|aircraft|jet|airliner crashes|crashed", "plane|aircraft|jet goes|went down"],
+    },
+    "someone vomits": {
+        "requires": ["vomit*|puke*|puking|retch*|barf*|sick", "throw|throws|threw|throwing up"],
+        "confirms": ["vomit|vomits|vomited|vomiting", "pukes|puked|puking", "retches|retched|retching"],
+    },
+    "there are bugs": {
+        "requires": ["bug|bugs|insect*|cockroach*|roach*|spider*|ant|ants|fly|flies|maggot*|beetle*|wasp*|bee|bees|"
+                     "mosquito*|worm|worms|larva*|centipede*|flea|fleas|lice|termite*|locust*"],
+        "confirms": ["swarm of flies|bees|insects|locusts", "spider|spiders|cockroach|cockroaches|maggots crawl*"],
+    },
+    "there's dog fighting": {
+        "requires": ["dog*|pitbull*", "pit bull|bulls"],
+        "confirms": ["dog fighting", "fighting dogs", "dogfighting ring|pit"],
+    },
+    "a baby cries": {
+        "requires": ["baby|babies|infant*|newborn*|toddler*"],
+        "confirms": ["baby|infant|newborn cries|crying|wails|wailing|screams|screaming|bawls|bawling"],
+    },
+    "a baby is stillborn": {
+        "requires": ["stillb*|baby|babies|pregnan*|deliver*", "born dead"],
+        "confirms": ["stillborn", "stillbirth"],
+    },
+    "a car crashes": {
+        "requires": ["car|cars|truck*|van|vans|vehicle*|sedan*|taxi*|cab|cabs|bus|crash*|collision*|wreck*|suv|jeep*|pickup"],
+        "confirms": ["car crash|crashes|wreck", "car|truck|van|vehicle|sedan|taxi|suv crashes|collides|flips",
+                     "car|truck|van|vehicle|sedan|taxi|suv slams into", "head-on collision"],
+    },
+    "a person is hit by a car": {
+        "requires": ["car|cars|truck*|van|vans|vehicle*|taxi*|cab|cabs|bus|struck", "run|runs|ran over"],
+        "confirms": ["hit|struck by a|an car|truck|van|bus|taxi|cab|vehicle", "run|mowed over|down by a|an car|truck|van|bus|taxi|vehicle",
+                     "car|truck|van|bus|taxi hits|strikes|plows him|her|them"],
+    },
+    "a pregnant person dies": {
+        "requires": ["pregnan*|expecting"],
+    },
+    "needles/syringes are used": {
+        "requires": ["needle*|syringe*|inject*|hypodermic*|iv|sedat*", "shoot|shoots up"],
+        "confirms": ["syringe|syringes|hypodermic", "injects|injected him|her|them|himself|herself|themselves"],
+    },
+    "someone has a seizure": {
+        "requires": ["seizure*|seizing|convuls*|epilep*|fit|fits|spasm*"],
+        "confirms": ["epileptic fit|seizure", "has|had|having a seizure"],
+    },
+    "someone has a stroke": {
+        "requires": ["stroke|strokes|aneurysm*|paraly*"],
+        "confirms": ["suffers|suffered a stroke"],
+    },
+    "someone has an abortion": {
+        "requires": ["abort*|terminat*|pregnan*|clinic"],
+        "confirms": ["had|has|have|get|gets|getting|having an abortion"],
+    },
+    "someone has cancer": {
+        "requires": ["cancer*|tumor*|tumour*|chemo*|oncolog*|leukemia|leukaemia|lymphoma|malignan*|carcinoma|radiation"],
+        "confirms": ["has|had|have|with|of cancer", "has|had|have|with|of * cancer", "chemotherapy|chemo|leukemia|leukaemia|tumor|tumour"],
+    },
+    "someone has dementia/Alzheimer's": {
+        "requires": ["dementia|alzheimer*|senil*|forget*", "memory loss"],
+        "confirms": ["dementia|alzheimer|alzheimers|alzheimer's"],
+    },
+    "someone is buried alive": {
+        "requires": ["buried|bury*|coffin*|grave|graves|casket*|entomb*"],
+        "confirms": ["buried alive", "bury him|her|them|you|me alive"],
+    },
+    "someone is burned alive": {
+        "requires": ["burn*|fire|fires|flame*|immolat*|ablaze|torch*|pyre"],
+        "confirms": ["burned|burnt alive", "burn|burns|burning him|her|them|you|me alive"],
+    },
+    "someone is kidnapped": {
+        "requires": ["kidnap*|abduct*|hostage*|ransom*|captiv*|taken"],
+        "confirms": ["kidnaps|kidnapped|abducts|abducted him|her|them|the", "ransom note|demand|demands"],
+    },
+    "someone is restrained": {
+        "requires": ["restrain*|tied|ties|bound|handcuff*|cuff*|strapped|shackle*|straitjacket*|zip-tie*|gagged",
+                     "pin|pins|pinned him|her|them down", "held down"],
+        "confirms": ["handcuffed|straitjacket", "restrains him|her|them", "strapped|tied to a|the chair|bed|table|gurney"],
+    },
+    "someone is stalked": {
+        "requires": ["stalk*|follow*|watching|watches"],
+        "confirms": ["stalk|stalks|stalked|stalking|stalker"],
+    },
+    "someone miscarries": {
+        "requires": ["miscarr*|pregnan*", "lost|losing the baby"],
+        "confirms": ["miscarriage|miscarried|miscarries", "lost the baby"],
+    },
+    "someone overdoses": {
+        "requires": ["overdos*|o.d|od'd|pills|drug|drugs|heroin|fentanyl|narcan"],
+        "confirms": ["overdose|overdoses|overdosed|overdosing|narcan"],
+    },
+    "someone says \"I'll kill myself\"": {
+        "requires": ["kill|killing myself", "end it"],
+        "confirms": ["i'll|gonna kill myself", "i will kill myself", "i'm going to kill myself"],
+    },
+    "someone says the n-word": {
+        "requires": ["nigg*|n-word"],
+        "confirms": ["nigger|niggers|nigga|niggas|niggaz"],
+    },
+    "the r-slur is used": {
+        "requires": ["retard*|r-word"],
+        "confirms": ["retard|retards|retarded"],
+    },
+    "there are hangings": {
+        "requires": ["hang*|hung|noose*|gallows|lynch*|rope"],
+        "confirms": ["noose|gallows|hanged|lynched|lynching", "hangs himself|herself|themselves"],
+    },
+    "there are homophobic slurs": {
+        "requires": ["fag*|dyke*|queer*|homo|homos|poof*|fairy|fairies|sissy|pansy"],
+        "confirms": ["faggot|faggots"],
+    },
+    "there's a hospital scene": {
+        "requires": ["hospital*|clinic*|infirmary|er|icu|ward|doctor*|nurse*|surgery|paramedic*|medical"],
+        "confirms": ["int|ext hospital*", "int|ext * hospital*", "hospital room|bed|corridor|hallway|ward|lobby",
+                     "emergency room", "intensive care"],
+    },
+    "there's a mental institution scene": {
+        "requires": ["asylum*|institution*|psychiatric|psych|sanitarium|sanatorium|arkham|committed|ward|hospital|clinic"],
+        "confirms": ["int|ext asylum|psychiatric|sanitarium|sanatorium", "int|ext * asylum|psychiatric|sanitarium|sanatorium",
+                     "psych ward", "mental hospital|institution", "insane asylum"],
+    },
+    "there's an explosion": {
+        "requires": ["explo*|blast*|bomb*|grenade*|dynamite|detonat*|boom|kaboom|fireball|missile*|rocket*|c-4|c4",
+                     "blow|blows|blew|blowing up"],
+        "confirms": ["explosion|explosions|detonates|fireball"],
+    },
+    "there's amputation": {
+        "requires": ["amput*|sever*|stump|stumps|prosthe*", "sawed|sawn|chopped|cut off"],
+        "confirms": ["amputate|amputates|amputated|amputation", "severed arm|leg|hand|foot|limb"],
+    },
+    "there's antisemitism": {
+        "requires": ["jew|jews|jewish|kike|kikes|nazi*|hitler|holocaust|semit*|antisemit*|anti-semit*|yid*|swastika*|zionis*"],
+        "confirms": ["kike|kikes|antisemitic|antisemitism|anti-semitic|anti-semitism"],
+    },
+    "there's bestiality": {
+        "requires": ["bestiality|zoophil*"],
+        "confirms": ["bestiality|zoophilia"],
+    },
+    "there's blood/gore": {
+        "requires": ["blood*|bleed*|bled|gore|gory|wound*|entrails|guts|viscera|splatter*|gash*"],
+        "confirms": ["pool|spray|splatter|trail|puddle of blood", "covered in blood", "blood sprays|splatters|pours|gushes|pools|spurts",
+                     "blood-soaked|bloodied"],
+    },
+    "there's cannibalism": {
+        "requires": ["cannibal*|flesh|eat|eats|eating|eaten|ate|devour*"],
+        "confirms": ["cannibal|cannibals|cannibalism|cannibalistic", "human flesh"],
+    },
+    "there's childbirth": {
+        "requires": ["birth*|labor|labour|deliver*|pregnan*|contraction*|push*|midwife|obstetric*|newborn*|c-section|caesarean|cesarean"],
+        "confirms": ["gives|giving|gave birth", "goes|went|is into labor|labour", "c-section",
+                     "delivers the baby"],
+    },
+    "there's eye mutilation": {
+        "requires": ["eye|eyes|eyeball*|blind*|gouge*|socket*"],
+        "confirms": ["gouges|gouged out his|her|their|an|the eye|eyes", "gouges|gouged his|her|their|an|the eye|eyes",
+                     "eye|eyes gouged", "empty eye socket|sockets"],
+    },
+    "there's fat suits": {
+        "requires": ["fat|fatsuit*|padding|prosthetic*"],
+        "confirms": ["fat suit|suits", "fatsuit|fatsuits"],
+    },
+    "there's finger/toe mutilation": {
+        "requires": ["finger*|toe|toes|thumb*|pinky|knuckle*|digit*|nail*|hand|hands|feet|foot"],
+        "confirms": ["cuts|chops|snips|slices|severs off his|her|their|a|the finger|toe|thumb|pinky",
+                     "severed finger|toe|thumb|pinky", "fingernail|toenail pulled|ripped|torn"],
+    },
+    "there's gun violence": {
+        "requires": ["gun|guns|pistol*|rifle*|shotgun*|revolver*|firearm*|handgun*|shoot*|shot|shots|gunfire|gunshot*|bullet*|"
+                     "sniper*|glock*|caliber|calibre|ak-47|uzi|magnum|gunman|gunmen"],
+        "confirms": ["shoots|shot him|her|them dead|in", "gunshot|gunshots|gunfire", "opens|open fire", "fires the gun",
+                     "shot dead", "shot in the head|chest|back|leg|arm|stomach|shoulder|face|neck|gut",
+                     "bullet hole|wound|holes|wounds"],
+    },
+    "there's torture": {
+        "requires": ["tortur*|interrogat*|torment*|waterboard*|pliers|electrocut*|brand*|rack"],
+        "confirms": ["tortures|tortured|torturing him|her|them", "torture chamber|device|devices", "waterboarding|waterboarded"],
+    },
+    "someone is stabbed": {
+        "requires": ["stab*|knife|knives|blade*|dagger*|shiv|impal*|sword*|machete*|bayonet*|scissors|skewer*|pierc*|gutted|shank*",
+                     "run through", "ice pick"],
+        "confirms": ["stabs|stabbed him|her|them|himself|herself", "impales|impaled", "plunges the knife|blade|dagger",
+                     "knife into his|her|their"],
+    },
+    "somebody is choked": {
+        "requires": ["chok*|strangl*|throttl*|throat|neck|garrot*|headlock|chokehold|smother*"],
+        "confirms": ["chokes him|her|them", "strangles|strangled|strangling|chokehold|garrotes|garroted",
+                     "hands around his|her|their throat|neck"],
+    },
+    "someone is slapped": {
+        "requires": ["slap*|smack*|backhand*|hit|hits|strike|strikes"],
+        "confirms": ["slaps|slapped him|her|them|me across|in the face", "backhands|backhanded him|her|them"],
+    },
+    "there's decapitation": {
+        "requires": ["decapitat*|behead*|head|heads|guillotine*|severed"],
+        "confirms": ["decapitate|decapitates|decapitated|decapitation|beheads|beheaded|beheading|guillotine",
+                     "severed head", "head cut|chopped|torn|ripped off"],
+    },
+    "there's incarceration": {
+        "requires": ["prison*|jail*|cell|cells|inmate*|convict*|penitentiary|incarcerat*|lock-up|lockup|detention|custody|parole*|"
+                     "sentenc*|guard|guards|warden|arrest*", "behind bars"],
+        "confirms": ["int|ext prison|jail|penitentiary", "int|ext * prison|jail|penitentiary", "prison cell|yard|guard|guards",
+                     "jail cell"],
+    },
+    "someone goes to therapy": {
+        "requires": ["therap*|psychiatr*|psycholog*|counsel*|shrink|analyst|session*", "social worker"],
+        "confirms": ["therapy session", "her|his|their|my therapist", "therapist's|psychiatrist's office"],
+    },
+    "there's BDSM": {
+        "requires": ["bdsm|bondage|dominatri*|submissive*|sadomasoch*|s&m|whip|whips|leather|gimp|kink*|safeword", "safe word"],
+        "confirms": ["bdsm|bondage|dominatrix|sadomasochism|sadomasochistic|safeword", "safe word"],
+    },
+    "there are 9/11 depictions": {
+        "requires": ["9/11|9-11|nine-eleven|wtc", "september 11*", "twin towers", "world trade center", "ground zero"],
+        "confirms": ["9/11", "september 11th", "twin towers", "world trade center", "ground zero"],
+    },
+    "there's blackface": {
+        "requires": ["blackface|minstrel*|makeup|make-up", "black face", "burnt cork", "shoe polish", "face paint"],
+        "confirms": ["blackface", "minstrel show"],
+    },
+    "there's deadnaming": {
+        "requires": ["deadnam*|trans*", "birth|real|old name"],
+        "confirms": ["deadname|deadnames|deadnamed|deadnaming"],
+    },
+    "someone is misgendered": {
+        "requires": ["misgender*|trans*|pronoun*|nonbinary|non-binary|gender*|drag|queen"],
+        "confirms": ["misgenders|misgendered|misgendering"],
+    },
+    "there's gender dysphoria": {
+        "requires": ["dysphori*|trans*|gender*|nonbinary|non-binary", "wrong body"],
+        "confirms": ["gender dysphoria"],
+    },
+    "someone drowns": {
+        "requires": ["drown*|water*|sea|seas|ocean*|lake*|river*|pool*|bath*|tub|sink|sinks|sinking|underwater|wave|waves|"
+                     "flood*|swim*|submerg*|pond|well"],
+        "confirms": ["drowns|drowned|drowning"],
+    },
+    "someone is held under water": {
+        "requires": ["water*|underwater|under|dunk*|drown*|submerg*|bath*|tub|pool|sink|toilet"],
+        "confirms": ["holds|held him|her|them under|underwater", "holds|held his|her|their head under|underwater",
+                     "pushes|forces|shoves his|her|their head under|underwater"],
+    },
+}
+
+# Matches in the (short, factual) Wikipedia summary count for more than matches in the script
+SUMMARY_WEIGHT = 3
+# Weighted confirm hits needed to mark a trigger present without asking the model
+CONFIRM_SCORE = 3
+# Separate confirm hits needed as well, so a single summary mention never confirms on its own
+CONFIRM_HITS = 2
+# Shortest script the prescreen decides from; anything shorter is likely a placeholder or truncated
+# scrape (a feature screenplay runs to 100k+ characters), and all its triggers go to the model
+MIN_SCRIPT_CHARS = 20000
+
+WORD_RE = re.compile(r"\w+(?:['&/.-]\w+)*")
+
+
+class KeywordPrescreen:
+    """
+    Settles triggers with unambiguous lexical evidence before any model call.
+
+    Every lexicon phrase is indexed by its first word, so a text is tokenised
+    once and each token only checks the phrases that can start with it; the
+    scan costs the same however many triggers are screened. A trigger whose
+    required vocabulary never appears is marked absent; one whose confirming
+    phrases score at least `confirm_score` over at least `confirm_hits`
+    separate matches is marked present; everything else, including triggers
+    missing from the lexicon, is left for the model. Scripts shorter than
+    `min_script_chars` are not screened at all.
+    """
+    def __init__(self, lexicon=LEXICON, summary_weight=SUMMARY_WEIGHT, confirm_score=CONFIRM_SCORE,
+                 confirm_hits=CONFIRM_HITS, min_script_chars=MIN_SCRIPT_CHARS):
+        self.lexicon = lexicon
+        self.summary_weight = summary_weight
+        self.confirm_score = confirm_score
+        self.confirm_hits = confirm_hits
+        self.min_script_chars = min_script_chars
+        self.stats = {"films": 0, "films_without_model": 0, "decisions": 0, "local_decisions": 0,
+                      "local_present": 0, "local_absent": 0}
+        self.lock = threading.Lock()
+
+        # Each phrase becomes a list of word alternatives plus the triggers it is evidence for
+        self.phrases = []  # (words, triggers it is required vocabulary for, triggers it confirms)
+        phrase_ids = {}
+        for trigger, entry in lexicon.items():
+            for kind in ("requires", "confirms"):
+                for phrase in entry.get(kind, []):
+                    if phrase not in phrase_ids:
+                        phrase_ids[phrase] = len(self.phrases)
+                        words = [self._parse_word(word) for word in phrase.lower().split()]
+                        self.phrases.append((words, set(), set()))
+                    self.phrases[phrase_ids[phrase]][1 if kind == "requires" else 2].add(trigger)
+
+        # First-word index: exact words and stems, each mapping to the phrases they can start
+        self.by_word, self.by_stem = {}, {}
+        for phrase_id, (words, _, _) in enumerate(self.phrases):
+            exact, stems = words[0]
+            for word in exact:
+                self.by_word.setdefault(word, []).append(phrase_id)
+            for stem in stems:
+                self.by_stem.setdefault(stem, []).append(phrase_id)
+        self.stem_lengths = sorted({len(stem) for stem in self.by_stem})
+
+    @staticmethod
+    def _parse_word(word):
+        # "a|b*" -> ({"a"}, ("b",)); a lone "*" matches any word and is represented by empty stem ""
+        exact, stems = set(), []
+        for alternative in word.split("|"):
+            if alternative.endswith("*"):
+                stems.append(alternative[:-1])
+            else:
+                exact.add(alternative)
+        return exact, tuple(stems)
+
+    @staticmethod
+    def tokenize(text):
+        """Lower-cases text into words, dropping possessive "'s" so "dog's" matches "dog"."""
+        tokens = WORD_RE.findall((text or "").lower())
+        return [token[:-2] if token.endswith("'s") else token for token in tokens]
+
+    def scan(self, text):
+        """
+        Counts lexicon evidence in one text.
+
+        Returns:
+            tuple: (set of triggers with any vocabulary present, dict trigger -> confirming hits)
+        """
+        tokens = self.tokenize(text)
+        mentioned, confirmed = set(), {}
+        for i, token in enumerate(tokens):
+            candidates = list(self.by_word.get(token, ()))
+            for length in self.stem_lengths:
+                if length > len(token):
+                    break
+                candidates.extend(self.by_stem.get(token[:length], ()))
+
+            for phrase_id in candidates:
+                words, required_for, confirms = self.phrases[phrase_id]
+                if not self._matches_rest(words, tokens, i):
+                    continue
+                mentioned.update(required_for)
+                mentioned.update(confirms)
+                for trigger in confirms:
+                    confirmed[trigger] = confirmed.get(trigger, 0) + 1
+        return mentioned, confirmed
+
+    @staticmethod
+    def _matches_rest(words, tokens, start):
+        if start + len(words) > len(tokens):
+            return False
+        for offset, (exact, stems) in enumerate(words[1:], start=1):
+            token = tokens[start + offset]
+            if token not in exact and not any(token.startswith(stem) for stem in stems):
+                return False
+        return True
+
+    def screen(self, script, summary, trigger_names):
+        """
+        Splits one film's triggers into locally decided and ambiguous ones.
+
+        Args:
+            script (str): Script text.
+            summary (str): Wikipedia summary text.
+            trigger_names (iterable): Every trigger to be decided (e.g. trigger_definitions names).
+
+        Returns:
+            tuple: (dict trigger -> 0/1 for decided triggers, list of triggers still needing the model)
+        """
+        decided, ambiguous = {}, []
+        if len((script or "").strip()) < self.min_script_chars:
+            # Too short to be a real script (placeholder page, truncated scrape): a missing word proves nothing
+            ambiguous = list(trigger_names)
+            trigger_names = []
+        else:
+            script_mentioned, script_confirmed = self.scan(script)
+            summary_mentioned, summary_confirmed = self.scan(summary)
+            mentioned = script_mentioned | summary_mentioned
+
+        for trigger in trigger_names:
+            entry = self.lexicon.get(trigger)
+            if entry is None:
+                ambiguous.append(trigger)
+                continue
+            script_hits, summary_hits = script_confirmed.get(trigger, 0), summary_confirmed.get(trigger, 0)
+            score = script_hits + self.summary_weight * summary_hits
+            if entry.get("requires") and trigger not in mentioned:
+                decided[trigger] = 0
+            elif entry.get("confirms") and score >= self.confirm_score and script_hits + summary_hits >= self.confirm_hits:
+                decided[trigger] = 1
+            else:
+                ambiguous.append(trigger)
+
+        with self.lock:
+            self.stats["films"] += 1
+            self.stats["films_without_model"] += not ambiguous
+            self.stats["decisions"] += len(decided) + len(ambiguous)
+            self.stats["local_decisions"] += len(decided)
+            self.stats["local_present"] += sum(decided.values())
+            self.stats["local_absent"] += len(decided) - sum(decided.values())
+        return decided, ambiguous
+
+    def screen_many(self, films, trigger_names):
+        """
+        Screens a whole catalogue.
+
+        Args:
+            films (iterable): (title, script, summary) tuples; may be a generator.
+            trigger_names (list): Every trigger to be decided.
+
+        Yields:
+            tuple: (title, decided, ambiguous) per film, in input order.
+        """
+        for title, script, summary in films:
+            decided, ambiguous = self.screen(script, summary, trigger_names)
+            yield title, decided, ambiguous
+
+    def get_stats(self):
+        """Returns screening counts plus the share of trigger decisions and films kept away from the model."""
+        with self.lock:
+            stats = dict(self.stats)
+        stats["local_decision_rate"] = stats["local_decisions"] / stats["decisions"] if stats["decisions"] else 0.0
+        stats["model_calls_saved_rate"] = stats["films_without_model"] / stats["films"] if stats["films"] else 0.0
+        return stats
+
+    def report(self):
+        stats = self.get_stats()
+        print(f"Pre-screened {stats['films']} films: {stats['local_decisions']} of {stats['decisions']} trigger decisions "
+              f"made locally ({stats['local_decision_rate']:.1%}; {stats['local_present']} present, {stats['local_absent']} absent), "
+              f"{stats['films_without_model']} films needed no model call ({stats['model_calls_saved_rate']:.1%})")
+
+
+# Screens local script files (.pdf or plain text), or every script in the corpus, against every trigger in movies.db.
+# Usage: python KeywordPrescreen.py script1.pdf script2.txt ...
+#        python KeywordPrescreen.py --corpus
+if __name__ == "__main__":
+    import os
+    import sqlite3
+    import time
+    from Database import DB_PATH
+
+    conn = sqlite3.connect(DB_PATH)
+    names = [name for (name,) in conn.execute("SELECT name FROM trigger_definitions ORDER BY id")]
+    conn.close()
+
+    def read_films(paths):
+        for path in paths:
+            if path.lower().endswith(".pdf"):
+                from sourcing.ScriptScraper import ScriptScraper
+                text = ScriptScraper().pdf_to_text(path)
+            else:
+                with open(path, encoding="utf-8", errors="replace") as script_file:
+                    text = script_file.read()
+            yield os.path.basename(path), text, ""
+
+    def read_corpus():
+        from ScriptCorpus import ScriptCorpus
+        for imdb_id, title, text in ScriptCorpus().iter_scripts():
+            yield title or imdb_id, text, ""
+
+    prescreen = KeywordPrescreen()
+    start = time.perf_counter()
+    films = read_corpus() if sys.argv[1:] == ["--corpus"] else read_films(sys.argv[1:])
+    for title, decided, ambiguous in prescreen.screen_many(films, names):
+        present = sorted(trigger for trigger, value in decided.items() if value)
+        print(f"{title}: {len(decided)} decided locally, {len(ambiguous)} for the model; present: {', '.join(present) or 'none'}")
+    prescreen.report()
+    print(f"Screened in {time.perf_counter() - start:.2f}s")
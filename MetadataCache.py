@@ -0,0 +1,136 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class MetadataCache:
+    """
+    Caches TMDB movie metadata keyed by IMDb ID, or by another key (e.g. TMDB id)
+    given its own table and key column.
+
+    Lookups go through a size-bounded in-process LRU first, then a sidecar SQLite
+    store so entries survive restarts. Entries older than the TTL are still served,
+    but a background refresh is started for them (stale-while-revalidate).
+    """
+    def __init__(self, db_path="tmdb_cache.db", ttl=7 * 24 * 3600, max_entries=2048, table="tmdb_metadata",
+                 key_column="imdb_id"):
+        self.db_path = db_path
+        self.table = table
+        self.key_column = key_column
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lru = OrderedDict()  # key -> (payload, fetched_at)
+        self.refreshing = set()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stale": 0, "refreshes": 0}
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        columns = [row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")]
+        if columns and key_column not in columns:
+            # Keyed under another column by an earlier version; it is only a cache, so start it afresh
+            self.conn.execute(f"DROP TABLE {table}")
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                {key_column} TEXT PRIMARY KEY,
+                payload TEXT,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def get_many(self, keys, loader):
+        """
+        Returns cached metadata for the given keys (IMDb IDs by default), loading any misses.
+
+        Args:
+            keys (list): Keys to look up.
+            loader (callable): Takes a list of keys and returns a dict of
+                key -> payload. A payload of None means "not on TMDB" and is
+                cached too; keys left out of the dict (e.g. on errors) are not cached.
+
+        Returns:
+            dict: key -> payload (or None) for every key that could be resolved.
+        """
+        found = {}
+        missing = []
+        stale = []
+        now = time.time()
+
+        with self.lock:
+            for key in keys:
+                entry = self.lru.get(key)
+                if entry is not None:
+                    self.lru.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                else:
+                    entry = self._read_disk(key)
+                    if entry is None:
+                        self.stats["misses"] += 1
+                        missing.append(key)
+                        continue
+                    self.stats["disk_hits"] += 1
+                    self._remember(key, entry)
+
+                payload, fetched_at = entry
+                found[key] = payload
+                if now - fetched_at > self.ttl and key not in self.refreshing:
+                    self.stats["stale"] += 1
+                    self.refreshing.add(key)
+                    stale.append(key)
+
+        if missing:
+            loaded = loader(missing)
+            self.put_many(loaded)
+            found.update(loaded)
+
+        if stale:
+            threading.Thread(target=self._refresh, args=(stale, loader), daemon=True).start()
+
+        return found
+
+    def put_many(self, payloads):
+        """Stores payloads (key -> payload or None) in memory and on disk."""
+        now = time.time()
+        with self.lock:
+            for key, payload in payloads.items():
+                self._remember(key, (payload, now))
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} ({self.key_column}, payload, fetched_at) VALUES (?, ?, ?)",
+                [(key, json.dumps(payload), now) for key, payload in payloads.items()]
+            )
+            self.conn.commit()
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self.lru)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def _refresh(self, keys, loader):
+        try:
+            self.put_many(loader(keys))
+            with self.lock:
+                self.stats["refreshes"] += 1
+        except Exception as e:
+            print(f"Metadata refresh failed for {keys}: {e}")
+        finally:
+            with self.lock:
+                self.refreshing.difference_update(keys)
+
+    def _read_disk(self, key):
+        row = self.conn.execute(
+            f"SELECT payload, fetched_at FROM {self.table} WHERE {self.key_column} = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def _remember(self, key, entry):
+        self.lru[key] = entry
+        self.lru.move_to_end(key)
+        while len(self.lru) > self.max_entries:
+            self.lru.popitem(last=False)
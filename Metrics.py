@@ -0,0 +1,211 @@
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency buckets in seconds, from a cached page (~1ms) to a slow TMDB or Gemini call
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Stats keys (from the caches' get_stats) exported as gauges; every other key is an event counter
+STATS_GAUGES = {"hit_rate", "entries", "memory_entries", "bytes"}
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def format_labels(names, values, extra=""):
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count per label set."""
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            values = sorted(self.values.items())
+        lines += [f"{self.name}{format_labels(self.labels, key)} {format_value(value)}" for key, value in values]
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observations (seconds) per label set."""
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self.series = {}  # label values -> [bucket counts..., sum, count]
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the wall-clock time of the with-block, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series = sorted((key, list(values)) for key, values in self.series.items())
+        for key, values in series:
+            for bound, count in zip(self.buckets, values):
+                bucket_labels = format_labels(self.labels, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+            inf_labels = format_labels(self.labels, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf_labels} {values[-1]}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, key)} {format_value(values[-2])}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, key)} {values[-1]}")
+        return lines
+
+
+class Metrics:
+    """
+    Process-wide registry of counters and histograms, rendered in the Prometheus text format.
+
+    Components that already keep their own hit/miss counts (MetadataCache,
+    ResponseCache, HttpCache) are registered as stats sources and read when the
+    metrics are rendered, so the hot paths pay nothing extra for them.
+    """
+    def __init__(self, prefix="streamsafe"):
+        self.prefix = prefix
+        self.metrics = {}
+        self.stats_sources = {}
+        self.lock = threading.Lock()
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter(f"{self.prefix}_{name}", help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(f"{self.prefix}_{name}", help_text, labels, buckets))
+
+    def register_stats(self, cache, get_stats):
+        """
+        Exports a cache's get_stats() dict on every render.
+
+        Args:
+            cache (str): Value of the "cache" label (e.g. "tmdb_metadata").
+            get_stats (callable): Returns a dict of numeric stats.
+        """
+        with self.lock:
+            self.stats_sources[cache] = get_stats
+
+    def render(self):
+        """Returns every metric in the Prometheus text exposition format."""
+        with self.lock:
+            metrics = list(self.metrics.values())
+            sources = list(self.stats_sources.items())
+        lines = []
+        for metric in metrics:
+            lines += metric.render()
+
+        gauges = {}
+        events = []
+        for cache, get_stats in sources:
+            for key, value in get_stats().items():
+                if not isinstance(value, (int, float)):
+                    continue
+                if key in STATS_GAUGES:
+                    gauges.setdefault(key, []).append((cache, value))
+                else:
+                    events.append((cache, key, value))
+        for key, samples in sorted(gauges.items()):
+            name = f"{self.prefix}_cache_{key}"
+            lines += [f"# HELP {name} Cache {key.replace('_', ' ')} (from get_stats)", f"# TYPE {name} gauge"]
+            lines += [f'{name}{{cache="{escape(cache)}"}} {format_value(value)}' for cache, value in samples]
+        if events:
+            name = f"{self.prefix}_cache_events_total"
+            lines += [f"# HELP {name} Cache hits, misses and evictions (from get_stats)", f"# TYPE {name} counter"]
+            lines += [f'{name}{{cache="{escape(cache)}",event="{escape(key)}"}} {format_value(value)}'
+                      for cache, key, value in events]
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="0.0.0.0"):
+        """Serves /metrics from a daemon thread, for processes without a web app (e.g. LoopScript)."""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.render().encode("utf-8")
+                self.send_response(200 if self.path.startswith("/metrics") else 404)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        print(f"Serving metrics on http://{host}:{port}/metrics")
+        return server
+
+    def _register(self, metric):
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+
+# Shared registry and the metrics recorded on the hot paths
+metrics = Metrics()
+
+REQUEST_SECONDS = metrics.histogram(
+    "request_seconds", "Web request latency by route", ("route", "method", "status"))
+OUTBOUND_SECONDS = metrics.histogram(
+    "outbound_request_seconds", "Outbound HTTP and Gemini call latency", ("host", "outcome"))
+SQLITE_SECONDS = metrics.histogram(
+    "sqlite_query_seconds", "SQLite query time, including reading the rows", ("query",))
+INGEST_STAGE_SECONDS = metrics.histogram(
+    "ingest_stage_seconds", "Ingestion time per title and stage", ("stage", "outcome"),
+    buckets=DEFAULT_BUCKETS + (120, 300, 600))
+PROFILED_REQUESTS = metrics.counter(
+    "profiled_requests_total", "Requests profiled through the X-Profile hook", ("route",))
+
+
+# Observe one outbound call; outcome is the HTTP status, or "error" when no response arrived
+@contextmanager
+def outbound(host):
+    start = time.perf_counter()
+    result = {"outcome": "error"}
+    try:
+        yield result
+    finally:
+        OUTBOUND_SECONDS.observe(time.perf_counter() - start, host=host, outcome=result["outcome"])
+
@@ -0,0 +1,71 @@
+import sqlite3
+import threading
+from array import array
+from bisect import bisect_right
+from Database import DB_PATH, get_version
+
+
+class MovieCard:
+    """One grid entry; `id` is the TMDB id the templates link to."""
+    __slots__ = ("movie_id", "imdb_id", "id", "title", "poster_path")
+
+    def __init__(self, movie_id, imdb_id, tmdb_id, title, poster_path):
+        self.movie_id = movie_id
+        self.imdb_id = imdb_id
+        self.id = tmdb_id
+        self.title = title
+        self.poster_path = poster_path
+
+
+class MovieCatalog:
+    """
+    In-memory copy of the movie_cards table, ordered by movie id.
+
+    Ids live in a compact array for bisecting and the cards in a parallel list
+    of slotted objects, so a page of the grid is a slice with no SQLite or
+    TMDB access. Reloaded when the catalogue change counter moves.
+    """
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self.version = None
+        # (movie_ids, cards) swapped in as one tuple so readers never see a half-built catalogue
+        self.snapshot = (array("q"), [])
+        self.lock = threading.Lock()
+
+    def load(self):
+        """Reads every card, ordered by movie id."""
+        conn = sqlite3.connect(self.db_path)
+        version = get_version(conn, "catalogue")
+        rows = conn.execute("""
+            SELECT movie_id, imdb_id, tmdb_id, title, poster_path
+            FROM movie_cards ORDER BY movie_id
+        """).fetchall()
+        conn.close()
+
+        self.snapshot = (array("q", (row[0] for row in rows)), [MovieCard(*row) for row in rows])
+        self.version = version
+        return self
+
+    def refresh(self, conn):
+        """Reloads the catalogue if ingestion has written since the last load."""
+        if get_version(conn, "catalogue") != self.version:
+            with self.lock:
+                if get_version(conn, "catalogue") != self.version:
+                    self.load()
+        return self
+
+    def page_ids(self, after, limit):
+        """Returns up to `limit` movie ids greater than `after`, in id order."""
+        movie_ids, _ = self.snapshot
+        start = bisect_right(movie_ids, after)
+        return movie_ids[start:start + limit].tolist()
+
+    def cards(self, movie_ids):
+        """Returns the cards for the given ids, in the same order, skipping unknown ids."""
+        known_ids, cards = self.snapshot
+        found = []
+        for movie_id in movie_ids:
+            position = bisect_right(known_ids, movie_id) - 1
+            if position >= 0 and known_ids[position] == movie_id:
+                found.append(cards[position])
+        return found
@@ -0,0 +1,86 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Response headers replayed from a cached entry; everything else is rebuilt per request
+CACHED_HEADERS = ("Content-Type", "X-Next-After")
+
+
+class CachedPage:
+    """A rendered response body plus the headers needed to replay it."""
+    __slots__ = ("body", "headers", "etag")
+
+    def __init__(self, body, headers):
+        self.body = body
+        self.headers = headers
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU of rendered responses.
+
+    Keys include the data version they were rendered from (see data_versions),
+    so pages rendered before an ingestion write are never served after it. When
+    the version moves the whole cache is dropped rather than left to age out.
+    """
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lru = OrderedDict()  # key -> CachedPage
+        self.size = 0
+        self.version = None
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        self.lock = threading.Lock()
+
+    def get(self, key, version):
+        """Returns the cached page for key at this data version, or None."""
+        with self.lock:
+            if version != self.version:
+                if self.version is not None:
+                    self.stats["invalidations"] += 1
+                self.lru.clear()
+                self.size = 0
+                self.version = version
+            page = self.lru.get(key)
+            if page is None:
+                self.stats["misses"] += 1
+                return None
+            self.lru.move_to_end(key)
+            self.stats["hits"] += 1
+            return page
+
+    def put(self, key, version, body, headers):
+        """
+        Stores a rendered body.
+
+        Args:
+            key (tuple): Route and query arguments.
+            version (tuple): Data version the body was rendered from.
+            body (bytes): Response body.
+            headers (dict): Header name -> value, for the names in CACHED_HEADERS.
+
+        Returns:
+            CachedPage: The stored page (also returned when it is too large to keep).
+        """
+        page = CachedPage(body, {name: headers[name] for name in CACHED_HEADERS if name in headers})
+        with self.lock:
+            if version != self.version or len(body) > self.max_bytes:
+                return page
+            old = self.lru.pop(key, None)
+            if old is not None:
+                self.size -= len(old.body)
+            self.lru[key] = page
+            self.size += len(body)
+            while len(self.lru) > self.max_entries or self.size > self.max_bytes:
+                _, evicted = self.lru.popitem(last=False)
+                self.size -= len(evicted.body)
+                self.stats["evictions"] += 1
+        return page
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats, entries=len(self.lru), bytes=self.size)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
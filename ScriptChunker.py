@@ -0,0 +1,98 @@
+import re
+
+# Scene headings such as "INT. KITCHEN - NIGHT", "12 EXT. ROOFTOP" or "INT./EXT. CAR"
+SCENE_HEADING_RE = re.compile(r"^[ \t]*(?:\d+[A-Z]?[ \t.]+)?(?:INT\b|EXT\b|INT\.?/EXT\b|I/E\b)", re.MULTILINE)
+PARAGRAPH_BREAK_RE = re.compile(r"\n[ \t]*\n")
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for English screenplay text)."""
+    return len(text) // 4 + 1
+
+
+class ScriptChunker:
+    """
+    Splits a screenplay into scene-aligned windows of at most `window_tokens` tokens.
+
+    Whole scenes are packed into each window; a scene larger than a window is
+    split on line breaks. The last `overlap_tokens` worth of scenes is repeated at
+    the start of the next window so events spanning a boundary keep their context.
+    """
+    def __init__(self, window_tokens=30000, overlap_tokens=500, count_tokens=estimate_tokens):
+        self.window_tokens = window_tokens
+        self.overlap_tokens = overlap_tokens
+        self.count_tokens = count_tokens
+
+    def split_scenes(self, script):
+        """Splits a script at scene headings, or at blank lines if it has none."""
+        starts = [match.start() for match in SCENE_HEADING_RE.finditer(script)]
+        if len(starts) < 2:
+            starts = [match.end() for match in PARAGRAPH_BREAK_RE.finditer(script)]
+        if not starts or starts[0] != 0:
+            starts.insert(0, 0)
+        return [script[start:end] for start, end in zip(starts, starts[1:] + [len(script)]) if script[start:end].strip()]
+
+    def chunk(self, script):
+        """
+        Packs a script into token-bounded windows.
+
+        Args:
+            script (str): Full script text.
+
+        Returns:
+            list: Window strings, in script order.
+        """
+        pieces = []
+        for scene in self.split_scenes(script):
+            tokens = self.count_tokens(scene)
+            if tokens <= self.window_tokens:
+                pieces.append((scene, tokens))
+            else:
+                pieces.extend(self._split_long(scene))
+
+        windows = []
+        current, current_tokens = [], 0
+        for piece, tokens in pieces:
+            if current and current_tokens + tokens > self.window_tokens:
+                windows.append("".join(text for text, _ in current))
+                current = self._overlap(current)
+                current_tokens = sum(t for _, t in current)
+                if current_tokens + tokens > self.window_tokens:
+                    current, current_tokens = [], 0
+            current.append((piece, tokens))
+            current_tokens += tokens
+        if current:
+            windows.append("".join(text for text, _ in current))
+        return windows
+
+    def _overlap(self, pieces):
+        kept, tokens = [], 0
+        for piece, piece_tokens in reversed(pieces):
+            if tokens + piece_tokens > self.overlap_tokens:
+                break
+            kept.insert(0, (piece, piece_tokens))
+            tokens += piece_tokens
+        return kept
+
+    def _split_long(self, scene):
+        parts, current, current_tokens = [], [], 0
+        lines = []
+        for line in scene.splitlines(keepends=True):
+            tokens = self.count_tokens(line)
+            if tokens <= self.window_tokens:
+                lines.append(line)
+                continue
+            # A single line longer than a window (e.g. text extracted without line breaks)
+            step = max(1, len(line) * self.window_tokens // tokens)
+            lines.extend(line[start:start + step] for start in range(0, len(line), step))
+
+        for line in lines:
+            tokens = self.count_tokens(line)
+            if current and current_tokens + tokens > self.window_tokens:
+                parts.append(("".join(current), current_tokens))
+                current, current_tokens = [], 0
+            current.append(line)
+            current_tokens += tokens
+        if current:
+            parts.append(("".join(current), current_tokens))
+        return parts
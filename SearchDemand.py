@@ -0,0 +1,89 @@
+import atexit
+import sqlite3
+import threading
+import time
+
+
+class SearchDemand:
+    """
+    Counts site searches that found no movies, in a sidecar SQLite file.
+
+    Those queries are films users want but the catalogue lacks, and ingestion
+    uses them to decide which titles to analyse first. Searches are buffered in
+    memory and written by a background thread every `flush_interval` seconds,
+    and once more at exit, so the search route does not wait on a write per
+    request and other processes (LoopScript) see demand within one interval.
+    """
+    def __init__(self, db_path="search_demand.db", flush_interval=60):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.flusher = None
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS search_demand (
+                query TEXT PRIMARY KEY,
+                searches INTEGER NOT NULL,
+                last_searched REAL NOT NULL
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def record(self, query):
+        """Counts one search with no results."""
+        query = query.strip().lower()
+        if not query:
+            return
+        with self.lock:
+            self.pending[query] = self.pending.get(query, 0) + 1
+            if self.flusher is None:
+                # Start flushing on the first search, so instances only read through counts() stay passive
+                self.flusher = threading.Thread(target=self._flush_loop, name="search-demand", daemon=True)
+                self.flusher.start()
+                atexit.register(self.flush)
+
+    def flush(self):
+        """Writes the buffered searches to the database."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return
+        now = time.time()
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.executemany("""
+                INSERT INTO search_demand (query, searches, last_searched) VALUES (?, ?, ?)
+                ON CONFLICT(query) DO UPDATE SET
+                    searches = searches + excluded.searches,
+                    last_searched = excluded.last_searched
+            """, [(query, count, now) for query, count in pending.items()])
+            conn.commit()
+        except sqlite3.Error:
+            # Put the searches back so the next flush retries them
+            with self.lock:
+                for query, count in pending.items():
+                    self.pending[query] = self.pending.get(query, 0) + count
+            raise
+        finally:
+            conn.close()
+
+    def counts(self):
+        """Returns query -> number of searches, including unflushed ones."""
+        conn = sqlite3.connect(self.db_path)
+        counts = dict(conn.execute("SELECT query, searches FROM search_demand"))
+        conn.close()
+        with self.lock:
+            for query, count in self.pending.items():
+                counts[query] = counts.get(query, 0) + count
+        return counts
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Failed to write search demand: {e}")
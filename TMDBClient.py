@@ -0,0 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from Metrics import outbound
+
+
+class TMDBClient:
+    """
+    Concurrent TMDB client shared by the web routes.
+
+    All requests go through one keep-alive requests.Session and a bounded thread
+    pool, so a page of movies is fetched in roughly one round-trip per stage
+    instead of one per movie.
+    """
+    def __init__(self, api_key, read_token, base_url="https://api.themoviedb.org/3", max_workers=8, timeout=5):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.host = urlsplit(base_url).netloc
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept": "application/json"})
+        if read_token:
+            self.session.headers.update({"Authorization": f"Bearer {read_token}"})
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tmdb")
+
+    def get(self, path, params=None):
+        """
+        Makes a single GET request against the TMDB API.
+
+        Args:
+            path (str): API path relative to the base URL (e.g., "movie/550").
+            params (dict, optional): Extra query parameters.
+
+        Returns:
+            requests.Response: The response, or None if the request failed outright.
+        """
+        query = {"api_key": self.api_key, "language": "en-US"}
+        query.update(params or {})
+        try:
+            with outbound(self.host) as call:
+                response = self.session.get(f"{self.base_url}/{path}", params=query, timeout=self.timeout)
+                call["outcome"] = response.status_code
+            return response
+        except requests.RequestException as e:
+            print(f"TMDB request failed for {path}: {e}")
+            return None
+
+    def get_many(self, paths):
+        """
+        Fetches several TMDB paths concurrently.
+
+        Args:
+            paths (list): (path, params) tuples.
+
+        Returns:
+            list: Decoded JSON (or None on failure) for each path, in the same order.
+        """
+        futures = [self.executor.submit(self._get_json, path, params) for path, params in paths]
+        return [future.result() for future in futures]
+
+    def find_movies(self, imdb_ids):
+        """
+        Resolves IMDb IDs to full TMDB movie details concurrently.
+
+        Each worker runs /find and then /movie/{id} for one IMDb ID, so a detail
+        fetch starts as soon as its own find result arrives.
+
+        Args:
+            imdb_ids (list): IMDb IDs to resolve.
+
+        Returns:
+            dict: imdb_id -> details (None if TMDB has no match), in input order.
+                  IDs whose requests failed are left out.
+        """
+        futures = [(imdb_id, self.executor.submit(self._find_movie, imdb_id)) for imdb_id in imdb_ids]
+        results = {}
+        for imdb_id, future in futures:
+            found, movie = future.result()
+            if found:
+                results[imdb_id] = movie
+        return results
+
+    def _find_movie(self, imdb_id):
+        response = self.get(f"find/{imdb_id}", {"external_source": "imdb_id"})
+        if response is None or response.status_code != 200:
+            print(f"TMDB error for {imdb_id}: {response.status_code if response is not None else 'no response'}")
+            return False, None
+
+        results = response.json().get("movie_results", [])
+        if not results:
+            return True, None
+
+        details_response = self.get(f"movie/{results[0]['id']}")
+        if details_response is None or details_response.status_code != 200:
+            return False, None
+
+        full_movie = details_response.json()
+        full_movie["imdb_id"] = imdb_id
+        return True, full_movie
+
+    def _get_json(self, path, params=None):
+        response = self.get(path, params)
+        if response is None or response.status_code != 200:
+            return None
+        return response.json()
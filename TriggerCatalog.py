@@ -0,0 +1,46 @@
+import threading
+from Database import get_version
+
+
+class TriggerCatalog:
+    """
+    In-memory copy of trigger_definitions.
+
+    Holds the category -> names grouping shown on the homepage and the name <-> id
+    lookups used to resolve selected triggers. It reloads only when the
+    trigger_definitions change counter in data_versions moves.
+    """
+    def __init__(self):
+        self.version = None
+        self.grouped = {}
+        self.name_to_id = {}
+        self.id_to_name = {}
+        self.lock = threading.Lock()
+
+    def refresh(self, conn):
+        """Reloads the definitions if they changed since the last load."""
+        version = get_version(conn, "trigger_definitions")
+        if version == self.version:
+            return self
+
+        with self.lock:
+            if version != self.version:
+                rows = conn.execute("""
+                    SELECT id, category, name
+                    FROM trigger_definitions
+                    ORDER BY category, name
+                """).fetchall()
+
+                grouped = {}
+                for _, category, name in rows:
+                    grouped.setdefault(category, []).append(name)
+
+                self.grouped = grouped
+                self.name_to_id = {name: trigger_id for trigger_id, _, name in rows}
+                self.id_to_name = {trigger_id: name for trigger_id, _, name in rows}
+                self.version = version
+        return self
+
+    def ids_for(self, names):
+        """Resolves trigger names to ids, skipping unknown names."""
+        return [self.name_to_id[name] for name in names if name in self.name_to_id]
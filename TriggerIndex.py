@@ -0,0 +1,78 @@
+import sqlite3
+import threading
+from Database import DB_PATH, blob_to_mask, get_version
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python scan is fine for small catalogues
+    np = None
+
+
+class TriggerIndex:
+    """
+    In-memory copy of every movie's trigger bitset (movies.trigger_mask).
+
+    "Safe for this user" is a single AND test between a movie's mask and the mask
+    of the user's selected triggers. With NumPy installed the whole catalogue is
+    tested at once on a (movies x 64-bit words) array.
+    """
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self.version = None
+        # (movie_ids, masks, words) swapped in as one tuple so readers never see a half-built index
+        self.snapshot = ([], [], None)
+        self.lock = threading.Lock()
+
+    def load(self):
+        """Reads all movie masks, ordered by movie id."""
+        conn = sqlite3.connect(self.db_path)
+        version = get_version(conn, "catalogue")
+        rows = conn.execute("SELECT id, trigger_mask FROM movies ORDER BY id").fetchall()
+        conn.close()
+
+        movie_ids = [movie_id for movie_id, _ in rows]
+        masks = [blob_to_mask(blob) for _, blob in rows]
+        words = None
+
+        if np is not None:
+            word_count = max(1, (max(masks, default=0).bit_length() + 63) // 64)
+            words = np.array(
+                [self._to_words(mask, word_count) for mask in masks],
+                dtype=np.uint64
+            ).reshape(len(masks), word_count)
+            movie_ids = np.array(movie_ids, dtype=np.int64)
+
+        self.snapshot = (movie_ids, masks, words)
+        self.version = version
+        return self
+
+    def refresh(self, conn):
+        """Reloads the index if ingestion has written since the last load."""
+        if get_version(conn, "catalogue") != self.version:
+            with self.lock:
+                if get_version(conn, "catalogue") != self.version:
+                    self.load()
+        return self
+
+    def safe_movie_ids(self, selected_mask):
+        """
+        Returns the ids of movies with none of the selected triggers, in id order.
+
+        Args:
+            selected_mask (int): Bitset of the user's selected trigger ids.
+
+        Returns:
+            list: Movie ids.
+        """
+        movie_ids, masks, words = self.snapshot
+        if words is not None:
+            selected = np.array(self._to_words(selected_mask, words.shape[1]), dtype=np.uint64)
+            hits = (words & selected).any(axis=1)
+            return movie_ids[~hits].tolist()
+
+        return [movie_id for movie_id, mask in zip(movie_ids, masks) if not mask & selected_mask]
+
+    @staticmethod
+    def _to_words(mask, word_count):
+        # Bits beyond word_count belong to triggers no movie has, so they can be dropped
+        return [(mask >> (64 * i)) & 0xFFFFFFFFFFFFFFFF for i in range(word_count)]
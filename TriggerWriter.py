@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+from Database import (DB_PATH, MOVIE_COLUMNS, bump_version, connect_writer, get_version, refresh_trigger_masks)
+
+
+class TriggerWriter:
+    """
+    Bulk writer for analysed movies and their triggers.
+
+    Keeps one connection and the trigger name -> id map for its lifetime, and
+    writes each batch of movies in a single transaction with executemany:
+    movies are upserted on imdb_id (so a movie keeps its id when re-analysed),
+    triggers are upserted on (movie_id, trigger_id), and the batch's
+    trigger_mask columns are updated in the same transaction.
+
+    The catalogue version, which makes the web process reload its catalogue and
+    trigger index and drop its page cache, is bumped at most once every
+    `version_interval` seconds. A batch written sooner leaves the bump to a timer
+    (or to close()), so a pipeline storing one film at a time does not trigger a
+    full reload per film.
+    """
+    def __init__(self, db_path=DB_PATH, batch_size=200,
+                 version_interval=float(os.getenv("CATALOGUE_VERSION_INTERVAL", 30))):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.version_interval = version_interval
+        self.conn = connect_writer(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.trigger_ids = {}
+        self.definitions_version = None
+        self.last_bump = 0.0
+        self.bump_pending = False
+        self.bump_timer = None
+
+    def write(self, results):
+        """
+        Stores analysis results, committing every `batch_size` movies.
+
+        Parameters:
+            results (iterable): (imdb_id, title, trigger_dict, movie_info) tuples; may be a generator.
+                movie_info is a Database.movie_info_from_tmdb dict or None.
+
+        Returns:
+            int: Number of movies written
+        """
+        written = 0
+        batch = []
+        for result in results:
+            if not result[0]:
+                print(f"Skipping '{result[1]}': no IMDb ID to store it under")
+                continue
+            batch.append(result)
+            if len(batch) >= self.batch_size:
+                written += self._write_batch(batch)
+                batch = []
+        if batch:
+            written += self._write_batch(batch)
+        return written
+
+    def close(self):
+        with self.lock:
+            if self.bump_timer is not None:
+                self.bump_timer.cancel()
+                self.bump_timer = None
+            if self.bump_pending:
+                self._bump_catalogue()
+            self.conn.close()
+
+    def _write_batch(self, batch):
+        # The last result for an imdb_id wins, as it would with one write per movie
+        batch = list({imdb_id: (imdb_id, title, trigger_dict, movie_info)
+                      for imdb_id, title, trigger_dict, movie_info in batch}.values())
+
+        with self.lock:
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                trigger_ids = self._trigger_ids(cursor, {
+                    name.strip() for _, _, trigger_dict, _ in batch for name in trigger_dict
+                })
+
+                cursor.executemany("""
+                    INSERT INTO movies (imdb_id, title) VALUES (?, ?)
+                    ON CONFLICT(imdb_id) DO UPDATE SET title = excluded.title
+                """, [(imdb_id, title) for imdb_id, title, _, _ in batch])
+                movie_ids = self._movie_ids(cursor, [imdb_id for imdb_id, _, _, _ in batch])
+
+                cursor.executemany(f"""
+                    UPDATE movies SET {", ".join(f"{column} = ?" for column in MOVIE_COLUMNS)}
+                    WHERE id = ?
+                """, [
+                    (*(movie_info.get(column) for column in MOVIE_COLUMNS), movie_ids[imdb_id])
+                    for imdb_id, _, _, movie_info in batch if movie_info
+                ])
+
+                cursor.executemany("""
+                    INSERT INTO triggers (movie_id, trigger_id, value) VALUES (?, ?, ?)
+                    ON CONFLICT(movie_id, trigger_id) DO UPDATE SET value = excluded.value
+                """, [
+                    (movie_ids[imdb_id], trigger_ids[name.strip()], int(value))
+                    for imdb_id, _, trigger_dict, _ in batch
+                    for name, value in trigger_dict.items()
+                ])
+
+                refresh_trigger_masks(cursor, list(movie_ids.values()))
+                bump_now = time.time() - self.last_bump >= self.version_interval
+                if bump_now:
+                    bump_version(cursor, "catalogue")
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                # The name map may hold ids of definitions inserted by the rolled-back transaction
+                self.definitions_version = None
+                raise
+
+            if bump_now:
+                self.last_bump = time.time()
+                self.bump_pending = False
+            else:
+                self.bump_pending = True
+                if self.bump_timer is None:
+                    delay = max(0.0, self.last_bump + self.version_interval - time.time())
+                    self.bump_timer = threading.Timer(delay, self._bump_pending)
+                    self.bump_timer.daemon = True
+                    self.bump_timer.start()
+        return len(batch)
+
+    def _bump_pending(self):
+        # Timer callback: publish writes that were committed without a version bump
+        with self.lock:
+            self.bump_timer = None
+            if self.bump_pending:
+                try:
+                    self._bump_catalogue()
+                except Exception as e:
+                    print(f"Failed to bump the catalogue version: {e}")
+
+    def _bump_catalogue(self):
+        # Caller holds self.lock
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            bump_version(cursor, "catalogue")
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.last_bump = time.time()
+        self.bump_pending = False
+
+    def _trigger_ids(self, cursor, names):
+        # Reload the map only when trigger_definitions changed since it was read
+        if get_version(cursor, "trigger_definitions") != self.definitions_version:
+            self.trigger_ids = {name: trigger_id for trigger_id, name in
+                                cursor.execute("SELECT id, name FROM trigger_definitions")}
+
+        missing = [name for name in names if name not in self.trigger_ids]
+        if missing:
+            # Insert new trigger definitions if missing (categories are still added manually)
+            cursor.executemany("INSERT OR IGNORE INTO trigger_definitions (name) VALUES (?)", [(name,) for name in missing])
+            self.trigger_ids = {name: trigger_id for trigger_id, name in
+                                cursor.execute("SELECT id, name FROM trigger_definitions")}
+        self.definitions_version = get_version(cursor, "trigger_definitions")
+        return self.trigger_ids
+
+    @staticmethod
+    def _movie_ids(cursor, imdb_ids):
+        movie_ids = {}
+        for start in range(0, len(imdb_ids), 500):
+            chunk = imdb_ids[start:start + 500]
+            placeholders = ",".join("?" for _ in chunk)
+            cursor.execute(f"SELECT imdb_id, id FROM movies WHERE imdb_id IN ({placeholders})", chunk)
+            movie_ids.update(cursor.fetchall())
+        return movie_ids
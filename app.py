@@ -1,192 +1,405 @@
+import cProfile
 import os
-import sqlite3
-from flask import Flask, render_template, request
-import requests
+import threading
+import time
+from bisect import bisect_right
+from functools import wraps
+from flask import Flask, g, jsonify, make_response, render_template, request
+from Database import ReadConnectionPool, blob_to_mask, get_version, mask_for, migrate
+from MetadataCache import MetadataCache
+from Metrics import CONTENT_TYPE, PROFILED_REQUESTS, REQUEST_SECONDS, SQLITE_SECONDS, metrics
+from MovieCatalog import MovieCatalog
+from ResponseCache import ResponseCache
+from SearchDemand import SearchDemand
+from TMDBClient import TMDBClient
+from TriggerCatalog import TriggerCatalog
+from TriggerIndex import TriggerIndex
 
 # Initialize the Flask app
 app = Flask(__name__)
+migrate()
+
+# Per-movie trigger bitsets, loaded at startup and reloaded when ingestion writes
+trigger_index = TriggerIndex().load()
+
+# Slim movie cards for the grid, loaded at startup and reloaded when ingestion writes
+movie_catalog = MovieCatalog().load()
+
+# Trigger definitions, reloaded when trigger_definitions changes
+trigger_catalog = TriggerCatalog()
+
+# Read-only SQLite connections, reused across requests
+db_pool = ReadConnectionPool(size=int(os.getenv("DB_POOL_SIZE", 8)))
+
+# Borrow a pooled connection for the current request
+def get_db():
+    if "db" not in g:
+        g.db = db_pool.acquire()
+    return g.db
+
+@app.teardown_appcontext
+def release_db(exception):
+    conn = g.pop("db", None)
+    if conn is not None:
+        db_pool.release(conn)
 
 # TMDB API key and read token
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
 TMDB_READ_TOKEN = os.getenv("TMDB_READ_TOKEN")
 
 # Base URL
-TMDB_BASE_URL = "https://api.themoviedb.org/3"
+TMDB_BASE_URL = os.getenv("TMDB_BASE_URL", "https://api.themoviedb.org/3")
+
+# Shared concurrent TMDB client
+tmdb_client = TMDBClient(
+    TMDB_API_KEY,
+    TMDB_READ_TOKEN,
+    base_url=TMDB_BASE_URL,
+    max_workers=int(os.getenv("TMDB_CONCURRENCY", 8)),
+    timeout=float(os.getenv("TMDB_TIMEOUT", 5))
+)
+
+# TMDB metadata cache (sidecar store next to movies.db)
+metadata_cache = MetadataCache(
+    db_path=os.getenv("TMDB_CACHE_DB", "tmdb_cache.db"),
+    ttl=int(os.getenv("TMDB_CACHE_TTL", 7 * 24 * 3600)),
+    max_entries=int(os.getenv("TMDB_CACHE_SIZE", 2048))
+)
+
+# Assembled detail-page records keyed by TMDB id (same sidecar store, separate table)
+detail_cache = MetadataCache(
+    db_path=os.getenv("TMDB_CACHE_DB", "tmdb_cache.db"),
+    ttl=int(os.getenv("TMDB_CACHE_TTL", 7 * 24 * 3600)),
+    max_entries=int(os.getenv("TMDB_DETAIL_CACHE_SIZE", 1024)),
+    table="tmdb_details",
+    key_column="tmdb_id"
+)
+
+# Searches that found nothing, read by LoopScript to prioritise ingestion (sidecar store)
+search_demand = SearchDemand(os.getenv("SEARCH_DEMAND_DB", "search_demand.db"))
+
+# Rendered pages, keyed by route and query string and dropped whenever ingestion writes
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", 1024)),
+    max_bytes=int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+)
+RESPONSE_MAX_AGE = int(os.getenv("RESPONSE_MAX_AGE", 60))
+
+# Hit rates of the TMDB and page caches, read when /metrics is scraped
+metrics.register_stats("tmdb_metadata", metadata_cache.get_stats)
+metrics.register_stats("tmdb_details", detail_cache.get_stats)
+metrics.register_stats("responses", response_cache.get_stats)
+
+# With PROFILE_DIR set, a request sent with "X-Profile: 1" runs under cProfile and its stats are
+# written to PROFILE_DIR. One request is profiled at a time; others arriving meanwhile run unprofiled.
+PROFILE_DIR = os.getenv("PROFILE_DIR")
+profile_lock = threading.Lock()
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    if PROFILE_DIR and request.headers.get("X-Profile") == "1" and profile_lock.acquire(blocking=False):
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+# Record latency per route template (not per URL, so movie ids do not each get a series)
+@app.after_request
+def record_request_metrics(response):
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    REQUEST_SECONDS.observe(time.perf_counter() - g.request_started, route=route, method=request.method,
+                            status=response.status_code)
+
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        profile_lock.release()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profile_path = os.path.join(PROFILE_DIR, f"{int(time.time() * 1000)}-{request.endpoint}.prof")
+        profiler.dump_stats(profile_path)
+        PROFILED_REQUESTS.inc(route=route)
+        response.headers["X-Profile-File"] = os.path.basename(profile_path)
+    return response
+
+@app.teardown_request
+def stop_request_profiler(exception):
+    # after_request is skipped if building the response failed; never leave the profiler running
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        profile_lock.release()
+
+# Serve a route from the rendered-page cache, with a strong ETag so repeat requests can get a 304
+def cached_page(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        conn = get_db()
+        with SQLITE_SECONDS.time(query="data_versions"):
+            version = (get_version(conn, "catalogue"), get_version(conn, "trigger_definitions"))
+        key = (request.path, tuple(sorted(request.args.items(multi=True))))
+
+        page = response_cache.get(key, version)
+        if page is None:
+            rendered = make_response(view(*args, **kwargs))
+            # Views set g.skip_response_cache when the page was built from incomplete data (e.g. TMDB down)
+            if rendered.status_code != 200 or g.pop("skip_response_cache", False):
+                # ... and neither should browsers or proxies
+                rendered.headers["Cache-Control"] = "no-store"
+                return rendered
+            page = response_cache.put(key, version, rendered.get_data(), rendered.headers)
+
+        response = make_response(page.body)
+        response.headers.update(page.headers)
+        response.set_etag(page.etag)
+        response.headers["Cache-Control"] = f"public, max-age={RESPONSE_MAX_AGE}"
+        return response.make_conditional(request)
+    return wrapper
 
 # Route for the homepage
 @app.route("/")
+@cached_page
 def home():
-    page = int(request.args.get("page", 1))
+    after = request.args.get("after", 0, type=int)
     limit = 21
-    offset = (page - 1) * limit
 
-    conn = sqlite3.connect("movies.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT imdb_id FROM movies LIMIT ? OFFSET ?", (limit, offset))
-    imdb_ids = [row[0] for row in cursor.fetchall()]
-    conn.close()
+    cursor = get_db().cursor()
+    movie_ids = query_movies(cursor, None, request.args.getlist("triggers"), limit, after)
 
-    filtered_movies = get_tmdb_data(imdb_ids)
+    filtered_movies = get_movie_cards(movie_ids)
 
     all_triggers = get_all_triggers()
-    return render_template("home.html", movies=filtered_movies, all_triggers=all_triggers)
+    return render_template("home.html", movies=filtered_movies, all_triggers=all_triggers,
+                           next_after=next_cursor(movie_ids, limit))
 
-# Get trigger definitions
+# Get trigger definitions grouped by category
 def get_all_triggers():
-    conn = sqlite3.connect("movies.db")
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT category, name
-        FROM trigger_definitions
-        ORDER BY category, name
-    """)
-    grouped = {}
-    for category, name in cursor.fetchall():
-        if category not in grouped:
-            grouped[category] = []
-        grouped[category].append(name)
-    conn.close()
-    return grouped
-
-
-# Get movie details from TMDB with IMDB ID
-def get_tmdb_data(imdb_ids):
-    headers = {
-        "Authorization": f"Bearer {TMDB_READ_TOKEN}",
-        "Accept": "application/json"
-    }
+    return trigger_catalog.refresh(get_db()).grouped
 
-    filtered_movies = []
 
-    for imdb_id in imdb_ids:
-        if not imdb_id:
-            continue
+# Page through local movies after the given id (keyset pagination), optionally matching a title
+# and leaving out movies with any selected trigger. Returns movie ids.
+def query_movies(cursor, query, selected_triggers, limit, after=0):
+    selected_mask = get_trigger_mask(selected_triggers)
 
-        find_url = f"{TMDB_BASE_URL}/find/{imdb_id}"
-        params = {"external_source": "imdb_id"}
-        response = requests.get(find_url, headers=headers, params=params)
-
-        if response.status_code == 200:
-            data = response.json()
-            results = data.get("movie_results", [])
-            if results:
-                movie = results[0]
-                movie_id = movie["id"]
-
-                #get movie details
-                details_url = f"{TMDB_BASE_URL}/movie/{movie_id}"
-                details_params = {"api_key": TMDB_API_KEY, "language": "en-US"}
-                details_response = requests.get(details_url, params=details_params)
-                if details_response.status_code == 200:
-                    full_movie = details_response.json()
-                    full_movie["imdb_id"] = imdb_id
-                    filtered_movies.append(full_movie)
-        else:
-            print(f"TMDB error for {imdb_id}: {response.status_code}")
+    if query:
+        with SQLITE_SECONDS.time(query="title_fts" if len(query) >= 3 else "title_like"):
+            if len(query) >= 3:
+                # Trigram full-text index over titles
+                cursor.execute("""
+                    SELECT m.id, m.trigger_mask
+                    FROM movies_fts f JOIN movies m ON m.id = f.rowid
+                    WHERE movies_fts MATCH ? AND m.id > ?
+                    ORDER BY m.id
+                """, ('"' + query.replace('"', '""') + '"', after))
+            else:
+                # Trigrams need at least three characters
+                cursor.execute("""
+                    SELECT m.id, m.trigger_mask FROM movies m
+                    WHERE LOWER(m.title) LIKE ? AND m.id > ?
+                    ORDER BY m.id
+                """, (f"%{query}%", after))
+
+            movie_ids = []
+            for movie_id, trigger_mask in cursor:
+                if not blob_to_mask(trigger_mask) & selected_mask:
+                    movie_ids.append(movie_id)
+                    if len(movie_ids) == limit:
+                        break
+        return movie_ids
+
+    if not selected_mask:
+        return movie_catalog.refresh(get_db()).page_ids(after, limit)
+
+    # One AND-mask test per movie against the in-memory bitsets
+    safe_ids = trigger_index.refresh(get_db()).safe_movie_ids(selected_mask)
+    start = bisect_right(safe_ids, after)
+    return safe_ids[start:start + limit]
+
+# Cursor for the next page: the last movie id shown, or None once results run out
+def next_cursor(movie_ids, limit):
+    return movie_ids[-1] if len(movie_ids) == limit else None
+
+# Resolve selected trigger names to a bitset of trigger_definitions ids
+def get_trigger_mask(selected_triggers):
+    return mask_for(trigger_catalog.refresh(get_db()).ids_for(selected_triggers))
+
+# Build movie cards from the in-memory catalogue, only going to TMDB for movies that have not been backfilled
+def get_movie_cards(movie_ids):
+    cards = movie_catalog.refresh(get_db()).cards(movie_ids)
+    missing = [card.imdb_id for card in cards if card.id is None]
+    fetched = {movie["imdb_id"]: movie for movie in get_tmdb_data(missing)} if missing else {}
+
+    # Movies TMDB did not resolve (failed, timed out or unknown) are left out, so keep this page out of the cache
+    if len(fetched) < len({imdb_id for imdb_id in missing if imdb_id}):
+        g.skip_response_cache = True
+
+    return [card if card.id is not None else fetched[card.imdb_id]
+            for card in cards if card.id is not None or card.imdb_id in fetched]
+
+# Get movie cards from TMDB with IMDB ID, served from the metadata cache where possible
+def get_tmdb_data(imdb_ids):
+    imdb_ids = [imdb_id for imdb_id in imdb_ids if imdb_id]
+    cached = metadata_cache.get_many(imdb_ids, find_movie_cards)
+    filtered_movies = [cached[imdb_id] for imdb_id in imdb_ids if cached.get(imdb_id)]
     print(f"Matched {len(filtered_movies)} local movies to TMDB metadata")
 
     return filtered_movies
 
+# Keep only the fields a card renders, so the cache does not hold full TMDB details responses
+def find_movie_cards(imdb_ids):
+    return {
+        imdb_id: {"id": movie["id"], "imdb_id": imdb_id, "title": movie.get("title"),
+                  "poster_path": movie.get("poster_path")} if movie else None
+        for imdb_id, movie in tmdb_client.find_movies(imdb_ids).items()
+    }
+
+# Prometheus-style metrics: route latency, outbound TMDB calls, SQLite query time and cache hit rates
+@app.route("/metrics")
+def metrics_page():
+    return metrics.render(), 200, {"Content-Type": CONTENT_TYPE}
+
+# Cache hit/miss counts for the TMDB metadata, movie detail and rendered-page caches
+@app.route("/cache_stats")
+def cache_stats():
+    stats = metadata_cache.get_stats()
+    stats["details"] = detail_cache.get_stats()
+    stats["responses"] = response_cache.get_stats()
+    return jsonify(stats)
+
 # Load more movies when scrolling down
 @app.route("/load_more")
+@cached_page
 def load_more():
-    page = int(request.args.get("page", 1))
+    after = request.args.get("after", 0, type=int)
     query = request.args.get("q", "").strip().lower()
-
     limit = 21
-    offset = (page - 1) * limit
 
-    conn = sqlite3.connect("movies.db")
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
+    movie_ids = query_movies(cursor, query, request.args.getlist("triggers"), limit, after)
 
-    if query:
-        cursor.execute("""
-            SELECT imdb_id FROM movies WHERE LOWER(title) LIKE ? LIMIT ? OFFSET ?
-        """, (f"%{query}%", limit, offset))
-    else:
-        cursor.execute("SELECT imdb_id FROM movies LIMIT ? OFFSET ?", (limit, offset))
-
-    imdb_ids = [row[0] for row in cursor.fetchall()]
-    conn.close()
+    movies = get_movie_cards(movie_ids)
+    response = make_response(render_template("partials/movie_cards.html", movies=movies))
 
-    movies = get_tmdb_data(imdb_ids)
-    return render_template("partials/movie_cards.html", movies=movies)
+    # The scroll handler continues from this id; no header means there are no more pages
+    next_after = next_cursor(movie_ids, limit)
+    if next_after is not None:
+        response.headers["X-Next-After"] = str(next_after)
+    return response
 
 # Search function for movies
 @app.route("/search", methods=["GET"])
+@cached_page
 def search():
     query = request.args.get("q", "").strip().lower()
-    page = int(request.args.get("page", 1))
+    after = request.args.get("after", 0, type=int)
     limit = 21
-    offset = (page - 1) * limit
 
-    conn = sqlite3.connect("movies.db")
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT imdb_id FROM movies
-        WHERE LOWER(title) LIKE ?
-        LIMIT ? OFFSET ?
-    """, (f"%{query}%", limit, offset))
-    imdb_ids = [row[0] for row in cursor.fetchall()]
-    conn.close()
+    cursor = get_db().cursor()
+    movie_ids = query_movies(cursor, query, request.args.getlist("triggers"), limit, after)
+
+    # Titles people look for but we do not have yet are analysed first by the ingestion loop.
+    # The miss page is never cached (here or by browsers), so every repeat search reaches this and is counted.
+    if not movie_ids and after == 0 and not request.args.getlist("triggers"):
+        search_demand.record(query)
+        g.skip_response_cache = True
 
-    matched_movies = get_tmdb_data(imdb_ids)
+    matched_movies = get_movie_cards(movie_ids)
 
-    return render_template("search_results.html", query=query, movies=matched_movies)
+    return render_template("search_results.html", query=query, movies=matched_movies,
+                           next_after=next_cursor(movie_ids, limit))
 
 # Get movie details when movie is selected
 @app.route("/movie/<int:movie_id>")
+@cached_page
 def movie_details(movie_id):
     selected_triggers = request.args.getlist("triggers")
 
-    # Fetch movie details from TMDB
-    movie_url = f"{TMDB_BASE_URL}/movie/{movie_id}"
-    credits_url = f"{TMDB_BASE_URL}/movie/{movie_id}/credits"
-    params = {"api_key": TMDB_API_KEY, "language": "en-US"}
-
-    movie = requests.get(movie_url, params=params).json()
-    credits = requests.get(credits_url, params=params).json()
-
-    crew = credits.get("crew", [])
-    director = next((member["name"] for member in crew if member["job"] == "Director"), "Unknown")
-    imdb_id = movie.get("imdb_id")
-    imdb_link = f"https://www.imdb.com/title/{imdb_id}"
-    genres = ", ".join([genre["name"] for genre in movie.get("genres", [])])
-    synopsis = movie.get("overview", "No synopsis available.")
-    poster_url = f"https://image.tmdb.org/t/p/w500{movie.get('poster_path')}"
-
-    # Get movie_id from local database
-    conn = sqlite3.connect("movies.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM movies WHERE imdb_id = ?", (imdb_id,))
-    row = cursor.fetchone()
-    triggers_to_display = []
-
-    if row:
-        local_movie_id = row[0]
-        # Only fetch triggers that are both selected AND have value=1
-        placeholders = ",".join("?" for _ in selected_triggers) or "''"
-        sql = f"""
-            SELECT td.name
-            FROM triggers t
-            JOIN trigger_definitions td ON t.trigger_id = td.id
-            WHERE t.movie_id = ? AND t.value = 1 AND td.name IN ({placeholders})
-        """
-        cursor.execute(sql, (local_movie_id, *selected_triggers))
-        triggers_to_display = [row[0] for row in cursor.fetchall()]
-
-    conn.close()
+    # Assemble the detail record (memory, local columns or one TMDB request) while SQLite finds the triggers
+    details_future = tmdb_client.executor.submit(detail_cache.get_many, [str(movie_id)], load_movie_details)
+    triggers_to_display = get_present_triggers("tmdb_id", movie_id, selected_triggers)
+    details = details_future.result().get(str(movie_id))
+
+    if details is None:
+        g.skip_response_cache = True
+        details = detail_record(None, None, None, "", None, None)
+    elif triggers_to_display is None:
+        # Movies not backfilled yet have no tmdb_id locally; match them on the IMDb ID instead
+        triggers_to_display = get_present_triggers("imdb_id", details["imdb_id"], selected_triggers)
 
     return render_template(
         "movie_details.html",
-        title=movie.get("title"),
-        imdb_link=imdb_link,
-        genres=genres,
-        director=director,
-        synopsis=synopsis,
-        poster_url=poster_url,
-        triggers=triggers_to_display 
+        title=details["title"],
+        imdb_link=details["imdb_link"],
+        genres=details["genres"],
+        director=details["director"],
+        synopsis=details["synopsis"],
+        poster_url=details["poster_url"],
+        triggers=triggers_to_display or []
     )
 
+# Detail records by TMDB id, built from the local movies columns when Backfill has filled them all and
+# otherwise from one TMDB request with the credits appended. Failed requests are left out so they are not cached.
+def load_movie_details(tmdb_ids):
+    conn = db_pool.acquire()
+    try:
+        placeholders = ",".join("?" for _ in tmdb_ids)
+        with SQLITE_SECONDS.time(query="movie_details"):
+            rows = conn.execute(f"""
+                SELECT tmdb_id, imdb_id, title, director, genres, overview, poster_path
+                FROM movies
+                WHERE tmdb_id IN ({placeholders}) AND imdb_id IS NOT NULL AND director IS NOT NULL
+                  AND genres IS NOT NULL AND overview IS NOT NULL AND poster_path IS NOT NULL
+            """, [int(tmdb_id) for tmdb_id in tmdb_ids]).fetchall()
+    finally:
+        db_pool.release(conn)
+    details = {str(row[0]): detail_record(*row[1:]) for row in rows}
+
+    for tmdb_id in tmdb_ids:
+        if tmdb_id in details:
+            continue
+        # Runs on the TMDB pool already, so call synchronously rather than queueing behind ourselves
+        response = tmdb_client.get(f"movie/{tmdb_id}", {"append_to_response": "credits"})
+        if response is None or response.status_code != 200:
+            continue
+        movie = response.json()
+        crew = (movie.get("credits") or {}).get("crew", [])
+        director = next((member["name"] for member in crew if member["job"] == "Director"), "Unknown")
+        genres = ", ".join([genre["name"] for genre in movie.get("genres", [])])
+        details[tmdb_id] = detail_record(movie.get("imdb_id"), movie.get("title"), director, genres,
+                                         movie.get("overview"), movie.get("poster_path"))
+    return details
+
+# The fields the detail page renders
+def detail_record(imdb_id, title, director, genres, overview, poster_path):
+    return {
+        "imdb_id": imdb_id,
+        "title": title,
+        "director": director or "Unknown",
+        "genres": genres,
+        "synopsis": overview or "No synopsis available.",
+        "poster_url": f"https://image.tmdb.org/t/p/w500{poster_path}",
+        "imdb_link": f"https://www.imdb.com/title/{imdb_id}",
+    }
+
+# Names of the selected triggers a local movie has (value = 1), found by tmdb_id or imdb_id.
+# Returns None when no local movie matches, so the caller can try the other id.
+def get_present_triggers(column, value, selected_triggers):
+    catalog = trigger_catalog.refresh(get_db())
+    selected_ids = catalog.ids_for(selected_triggers)
+    if not selected_ids:
+        return []
+
+    placeholders = ",".join("?" for _ in selected_ids)
+    with SQLITE_SECONDS.time(query="movie_triggers"):
+        rows = get_db().execute(f"""
+            SELECT t.trigger_id
+            FROM movies m
+            LEFT JOIN triggers t
+                ON t.movie_id = m.id AND t.value = 1 AND t.trigger_id IN ({placeholders})
+            WHERE m.{column} = ?
+        """, (*selected_ids, value)).fetchall()
+    if not rows:
+        return None
+    return [catalog.id_to_name[trigger_id] for (trigger_id,) in rows if trigger_id is not None]
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8080, debug=True)
\ No newline at end of file
@@ -0,0 +1,149 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from harness import build_catalogue, isolated_env, print_results, summarise, synthetic_results
+from stub_servers import StubServices, synthetic_movie
+
+# Measures ingestion throughput against the local stand-ins: script scraping, Wikipedia
+# summaries, and storing analysed movies on top of a synthetic catalogue.
+# Usage: python benchmarks/bench_ingest.py [--movies 10000] [--sample 200] [--writes 2000] [--latency-ms 100]
+# Gemini is not stood in for; analysis is benchmarked offline by KeywordPrescreen's own CLI.
+
+
+def timed_calls(name, func, items, workers):
+    """Runs func over items on `workers` threads; a falsy or error-message result counts as an error."""
+    timings = []
+    errors = []
+
+    def call(item):
+        start = time.perf_counter()
+        try:
+            result = func(item)
+            ok = bool(result) and not (isinstance(result, str) and result.startswith(("Failed", "An error")))
+            ok = ok and not (isinstance(result, dict) and "error" in result)
+        except Exception as e:
+            print(f"{name} failed: {e}")
+            ok = False
+        (timings if ok else errors).append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(call, items))
+    return summarise(name, timings, time.perf_counter() - start, len(errors))
+
+
+def bench_scrapers(movies, workers):
+    from sourcing.ScriptScraper import ScriptScraper
+    from sourcing.SumScraper import SumScraper
+    script_scraper = ScriptScraper()
+    sum_scraper = SumScraper()
+
+    short_id = lambda movie: movie["imdb_id"][2:]
+    results = [
+        # The first call of each crawls and parses the site's whole index, as a cold ingestion run would
+        timed_calls("ScriptScraper.sfy_get", lambda movie: script_scraper.sfy_get(movie["title"], short_id(movie)),
+                    movies, workers),
+        timed_calls("ScriptScraper.dailyscript_get", lambda movie: script_scraper.dailyscript_get(short_id(movie)),
+                    movies, workers),
+        timed_calls("SumScraper.get_wikipedia_summary",
+                    lambda movie: sum_scraper.get_wikipedia_summary(movie["title"], movie["director"], movie["imdb_id"]),
+                    movies, workers),
+    ]
+
+    # Batched path: one Wikidata lookup per 50 movies, then one parse request per page
+    batch = [(movie["title"], movie["director"], movie["imdb_id"]) for movie in movies]
+    start = time.perf_counter()
+    summaries = sum_scraper.get_wikipedia_summaries(batch, workers=workers)
+    elapsed = time.perf_counter() - start
+    result = summarise("SumScraper.get_wikipedia_summaries", [elapsed / len(batch)] * len(batch), elapsed,
+                       sum(1 for summary in summaries if "error" in summary))
+    result["p50_ms"] = result["p99_ms"] = elapsed * 1000  # one call for the whole batch
+    results.append(result)
+    return results
+
+
+def bench_writes(db_path, movies, writes, trigger_names, seed):
+    from TriggerWriter import TriggerWriter
+    results = []
+
+    # New movies appended to the catalogue, then re-analysed existing ones (upserts)
+    new_rows = list(synthetic_results(movies + writes, trigger_names, seed, start=movies + 1))
+    rng = random.Random(seed)
+    existing = rng.sample(range(1, movies + 1), min(writes, movies))
+    update_rows = [next(synthetic_results(n, trigger_names, seed + 1, start=n)) for n in existing]
+
+    try:
+        from LoopScript import insert_movie_triggers
+    except ImportError as e:
+        print(f"insert_movie_triggers skipped ({e})")
+        insert_movie_triggers = None
+
+    half = len(new_rows) // 2
+    if insert_movie_triggers is not None:
+        for name, rows in [("insert_movie_triggers new", new_rows[:half]),
+                           ("insert_movie_triggers update", update_rows[:len(update_rows) // 2])]:
+            timings = []
+            start = time.perf_counter()
+            for imdb_id, title, trigger_dict, movie_info in rows:
+                call_start = time.perf_counter()
+                insert_movie_triggers(imdb_id, title, trigger_dict, db_path, movie_info)
+                timings.append(time.perf_counter() - call_start)
+            results.append(summarise(name, timings, time.perf_counter() - start))
+
+    # The pipeline's store stage: one long-lived writer, batched transactions
+    writer = TriggerWriter(db_path)
+    try:
+        for name, rows in [("TriggerWriter.write new", new_rows[half:]),
+                           ("TriggerWriter.write update", update_rows[len(update_rows) // 2:])]:
+            start = time.perf_counter()
+            writer.write(rows)
+            elapsed = time.perf_counter() - start
+            results.append(summarise(name, [elapsed / len(rows)] * len(rows), elapsed))
+    finally:
+        writer.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--movies", type=int, default=10000, help="synthetic catalogue size")
+    parser.add_argument("--sample", type=int, default=200, help="movies scraped per scraper benchmark")
+    parser.add_argument("--writes", type=int, default=2000, help="movies stored per write benchmark")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=100, help="injected round-trip for every stand-in")
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--script-kb", type=int, default=60, help="size of each synthetic script")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip", choices=["scrapers", "writes"], action="append", default=[])
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="streamsafe-bench-")
+    db_path = os.path.join(workdir, "catalogue.db")
+    stubs = StubServices(movies=args.movies, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                         seed=args.seed, script_size=args.script_kb * 1000).start()
+    os.environ.update(isolated_env(stubs, workdir, db_path))
+
+    results = []
+    if "scrapers" not in args.skip:
+        rng = random.Random(args.seed)
+        movies = [synthetic_movie(n, args.seed) for n in rng.sample(range(1, args.movies + 1), args.sample)]
+        results += bench_scrapers(movies, args.workers)
+    if "writes" not in args.skip:
+        trigger_names = build_catalogue(db_path, args.movies, args.seed)
+        results += bench_writes(db_path, args.movies, args.writes, trigger_names, args.seed)
+
+    print(f"\n{args.movies} movies, {args.workers} workers, stand-in latency {args.latency_ms:.0f}ms")
+    print_results(results)
+    print(f"Stand-in requests: {stubs.hits}")
+    stubs.stop()
+
+
+if __name__ == "__main__":
+    main()
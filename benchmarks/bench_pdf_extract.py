@@ -0,0 +1,59 @@
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import sourcing.ScriptScraper as script_scraper_module
+from sourcing.ScriptScraper import ScriptScraper
+
+# Compares PDF text extraction paths on the bundled example scripts.
+# Usage: python benchmarks/bench_pdf_extract.py [repeats]
+
+EXAMPLE_PDFS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "sourcing", "ExampleScripts", "*.pdf")))
+
+
+def pypdf2_concat(pdf_path):
+    """The previous fetch_pdf_script path: PyPDF2 with repeated string concatenation."""
+    from PyPDF2 import PdfReader
+    with open(pdf_path, "rb") as pdf_file:
+        pdf_reader = PdfReader(pdf_file)
+        script_text = ""
+        for page in pdf_reader.pages:
+            script_text += page.extract_text()
+    return script_text
+
+
+def time_it(func, pdf_path, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        text = func(pdf_path)
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(text)
+
+
+def main(repeats=3):
+    # The example scripts are below the page threshold; force the pool path so it gets measured
+    script_scraper_module.PARALLEL_PAGE_THRESHOLD = 1
+    scraper = ScriptScraper()
+    engines = {
+        "pypdf2 (old)": pypdf2_concat,
+        "pymupdf": lambda path: scraper.extract_pdf_text(path, workers=1),
+        "pymupdf x4 procs": lambda path: scraper.extract_pdf_text(path, workers=4),
+    }
+
+    print(f"{'script':<22}{'engine':<20}{'best (s)':>10}{'chars':>10}")
+    for pdf_path in EXAMPLE_PDFS:
+        for name, func in engines.items():
+            try:
+                seconds, chars = time_it(func, pdf_path, repeats)
+            except ImportError as e:
+                print(f"{os.path.basename(pdf_path):<22}{name:<20}{'skipped':>10}  ({e})")
+                continue
+            print(f"{os.path.basename(pdf_path):<22}{name:<20}{seconds:>10.3f}{chars:>10}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,128 @@
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from harness import build_catalogue, create_schema, isolated_env, print_results, summarise
+from stub_servers import TITLE_WORDS, StubServices, synthetic_movie
+
+# Load-tests the web routes against a synthetic catalogue, with TMDB served by a local stand-in.
+# Usage: python benchmarks/bench_routes.py [--movies 10000] [--requests 500] [--concurrency 8] [--latency-ms 50]
+# The same --seed gives the same catalogue and the same request sequence on every run.
+
+SCENARIOS = ["/", "/load_more", "/search", "/movie/<id>"]
+
+
+def scenario_urls(scenario, count, movies, trigger_names, rng, seed=0):
+    """Request paths for one scenario, drawn from the seeded generator."""
+    urls = []
+    for _ in range(count):
+        params = [("triggers", name) for name in rng.sample(trigger_names, rng.choice([0, 0, 1, 3]))]
+        if scenario == "/":
+            if rng.random() < 0.3:
+                params.append(("after", rng.randint(1, movies)))
+            urls.append("/?" + urlencode(params))
+        elif scenario == "/load_more":
+            params.append(("after", rng.randint(1, movies)))
+            if rng.random() < 0.3:
+                params.append(("q", rng.choice(TITLE_WORDS)))
+            urls.append("/load_more?" + urlencode(params))
+        elif scenario == "/search":
+            # Mostly title words; some whole titles, short queries and misses
+            query = rng.choice([rng.choice(TITLE_WORDS), rng.choice(TITLE_WORDS),
+                                synthetic_movie(rng.randint(1, movies), seed)["title"], rng.choice(TITLE_WORDS)[:2],
+                                f"unknown film {rng.randint(1, 10 ** 6)}"])
+            urls.append("/search?" + urlencode([("q", query)] + params))
+        else:
+            urls.append(f"/movie/{rng.randint(1, movies)}?" + urlencode(params))
+    return urls
+
+
+def run_scenario(base_url, name, urls, concurrency):
+    import requests
+    local = threading.local()
+    timings = []
+    errors = []
+
+    def fetch(url):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            response = local.session.get(base_url + url, timeout=60)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - start
+        (timings if ok else errors).append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(fetch, urls))
+    return summarise(name, timings, time.perf_counter() - start, len(errors))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--movies", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=50, help="injected TMDB round-trip")
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--distinct", type=int, default=0,
+                        help="distinct URLs per scenario, repeated to fill --requests (0 = all distinct)")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed requests per scenario")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="keep the catalogue and caches here instead of a temporary directory")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="streamsafe-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    db_path = os.path.join(workdir, f"catalogue-{args.movies}-{args.seed}.db")
+
+    stubs = StubServices(movies=args.movies, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                         seed=args.seed).start()
+    os.environ.update(isolated_env(stubs, workdir, db_path))
+    if os.path.exists(db_path):
+        trigger_names = create_schema(":memory:")  # reuse the catalogue from an earlier run in --workdir
+    else:
+        trigger_names = build_catalogue(db_path, args.movies, args.seed)
+
+    # Import the app only once the environment points at the catalogue and the stand-ins
+    import app as web
+    from werkzeug.serving import make_server
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, web.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    rng = random.Random(args.seed)
+    results = []
+    for scenario in SCENARIOS:
+        distinct = args.distinct or args.requests
+        urls = scenario_urls(scenario, distinct + args.warmup, args.movies, trigger_names, rng, args.seed)
+        warmup, urls = urls[:args.warmup], urls[args.warmup:]
+        urls = [urls[i % distinct] for i in range(args.requests)]
+        run_scenario(base_url, scenario, warmup, args.concurrency)
+        results.append(run_scenario(base_url, scenario, urls, args.concurrency))
+
+    print(f"\n{args.movies} movies, {args.concurrency} clients, TMDB latency {args.latency_ms:.0f}ms, "
+          f"{'all distinct' if not args.distinct else f'{args.distinct} distinct'} URLs")
+    print_results(results)
+    print(f"Stand-in requests: {stubs.hits}")
+    print(f"Response cache: {web.response_cache.get_stats()}")
+
+    server.shutdown()
+    stubs.stop()
+
+
+if __name__ == "__main__":
+    main()
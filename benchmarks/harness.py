@@ -0,0 +1,133 @@
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from stub_servers import synthetic_movie
+
+# Shared pieces of the route and ingestion benchmarks: a synthetic catalogue,
+# an isolated environment, and p50/p99/RPS reporting.
+
+SOURCE_DB = os.path.join(os.path.dirname(__file__), "..", "movies.db")
+
+
+def isolated_env(stubs, workdir, db_path):
+    """
+    Environment for a benchmark run: every external service points at the stand-ins
+    and every database and on-disk cache lives in workdir, so runs never touch
+    movies.db or the real caches and always start cold.
+    """
+    env = stubs.env()
+    env.update({
+        "STREAMSAFE_DB": db_path,
+        "HTTP_CACHE_DIR": os.path.join(workdir, "http_cache"),
+        "SCRIPT_INDEX_DIR": os.path.join(workdir, "script_index"),
+        "SCRIPT_CORPUS_DIR": os.path.join(workdir, "corpus"),
+        "TMDB_CACHE_DB": os.path.join(workdir, "tmdb_cache.db"),
+        "SEARCH_DEMAND_DB": os.path.join(workdir, "search_demand.db"),
+        "GEMINI_QUOTA_DB": os.path.join(workdir, "gemini_quota.db"),
+        "TMDB_API_KEY": "benchmark",
+        "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", "benchmark"),
+    })
+    return env
+
+
+def create_schema(db_path, source_db=SOURCE_DB):
+    """Creates the base movies/triggers/trigger_definitions tables and copies the trigger definitions."""
+    source = sqlite3.connect(f"file:{source_db}?mode=ro", uri=True)
+    tables = source.execute("""
+        SELECT sql FROM sqlite_master
+        WHERE type = 'table' AND name IN ('movies', 'trigger_definitions', 'triggers')
+        ORDER BY name = 'triggers'
+    """).fetchall()
+    definitions = source.execute("SELECT id, name, category FROM trigger_definitions ORDER BY id").fetchall()
+    source.close()
+
+    conn = sqlite3.connect(db_path)
+    for (sql,) in tables:
+        conn.execute(sql)
+    conn.executemany("INSERT INTO trigger_definitions (id, name, category) VALUES (?, ?, ?)", definitions)
+    conn.commit()
+    conn.close()
+    return [name for _, name, _ in definitions]
+
+
+def synthetic_results(movies, trigger_names, seed=0, trigger_rate=0.05, start=1):
+    """Yields TriggerWriter tuples for synthetic movies start..movies, each with every trigger set."""
+    from Database import movie_info_from_tmdb
+    for n in range(start, movies + 1):
+        movie = synthetic_movie(n, seed)
+        rng = random.Random(seed * 7919 + n)
+        trigger_dict = {name: int(rng.random() < trigger_rate) for name in trigger_names}
+        details = {"id": movie["tmdb_id"], "poster_path": movie["poster_path"], "overview": movie["overview"],
+                   "release_date": f"{movie['year']}-06-01",
+                   "genres": [{"id": genre_id, "name": name} for genre_id, name in movie["genres"]]}
+        yield movie["imdb_id"], movie["title"], trigger_dict, movie_info_from_tmdb(details, movie["director"])
+
+
+def build_catalogue(db_path, movies, seed=0, trigger_rate=0.05):
+    """
+    Builds a migrated database of synthetic movies matching the stand-in services.
+
+    Parameters:
+        db_path (str): Database file to create (must not exist).
+        movies (int): Catalogue size.
+        seed (int): Seed for titles, metadata and trigger values.
+        trigger_rate (float): Share of trigger values that are 1.
+
+    Returns:
+        list: Trigger names, in trigger_definitions id order.
+    """
+    from Database import migrate
+    from TriggerWriter import TriggerWriter
+
+    trigger_names = create_schema(db_path)
+    migrate(db_path)
+    start = time.perf_counter()
+    writer = TriggerWriter(db_path, batch_size=1000)
+    try:
+        writer.write(synthetic_results(movies, trigger_names, seed, trigger_rate))
+    finally:
+        writer.close()
+    print(f"Built a {movies}-movie synthetic catalogue in {time.perf_counter() - start:.1f}s")
+    return trigger_names
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def summarise(name, timings, elapsed, errors=0):
+    """
+    Summarises one scenario.
+
+    Args:
+        name (str): Scenario name.
+        timings (list): Seconds per request (or per item).
+        elapsed (float): Wall-clock seconds for the whole scenario.
+        errors (int): Failed requests.
+
+    Returns:
+        dict: name, count, errors, p50_ms, p99_ms, rps.
+    """
+    timings = sorted(timings)
+    return {
+        "name": name,
+        "count": len(timings),
+        "errors": errors,
+        "p50_ms": percentile(timings, 0.50) * 1000,
+        "p99_ms": percentile(timings, 0.99) * 1000,
+        "rps": len(timings) / elapsed if elapsed else 0.0,
+    }
+
+
+def print_results(results):
+    print(f"{'scenario':<28}{'count':>8}{'errors':>8}{'p50 (ms)':>11}{'p99 (ms)':>11}{'per sec':>10}")
+    for result in results:
+        print(f"{result['name']:<28}{result['count']:>8}{result['errors']:>8}"
+              f"{result['p50_ms']:>11.1f}{result['p99_ms']:>11.1f}{result['rps']:>10.1f}")
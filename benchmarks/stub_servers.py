@@ -0,0 +1,378 @@
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, quote, unquote, urlsplit
+
+# Local stand-ins for every external HTTP service the app and LoopScript call.
+# One server hosts all of them under a path prefix per service; env() returns the
+# variables that point the code at it. Responses come from recorded fixtures
+# (benchmarks/fixtures/<service>/) where one exists, and are otherwise generated
+# from a synthetic catalogue so any catalogue size can be served.
+#
+# Record fixtures from the live services (TMDB needs TMDB_API_KEY):
+#   python benchmarks/stub_servers.py record tmdb /3/movie/550
+# Serve stand-ins on a fixed port for manual runs:
+#   python benchmarks/stub_servers.py serve [port]
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# Live base URL behind each stand-in prefix, used when recording
+UPSTREAMS = {
+    "tmdb": "https://api.themoviedb.org",
+    "wikipedia": "https://en.wikipedia.org",
+    "wikidata": "https://www.wikidata.org",
+    "sfy": "https://sfy.ru",
+    "dailyscript": "https://www.dailyscript.com",
+}
+
+# Query parameters left out of fixture keys (credentials and per-run noise)
+IGNORED_PARAMS = {"api_key", "language"}
+
+# First synthetic IMDb number; keeps synthetic IDs clear of real ones in recorded fixtures
+IMDB_OFFSET = 9000000
+
+# Words synthetic titles, summaries and scripts are built from
+TITLE_WORDS = ["silent", "harbor", "crimson", "night", "last", "summer", "broken", "river", "iron", "garden",
+               "hollow", "city", "winter", "falcon", "glass", "kingdom", "shadow", "letter", "wild", "station",
+               "golden", "storm", "paper", "moon", "secret", "fire", "lost", "empire", "velvet", "road"]
+SCRIPT_WORDS = ["door", "window", "looks", "walks", "car", "phone", "rain", "smiles", "gun", "knife", "blood",
+                "argue", "drinks", "kiss", "runs", "screams", "quiet", "table", "letter", "money", "dog", "street"]
+GENRES = [(28, "Action"), (18, "Drama"), (35, "Comedy"), (27, "Horror"), (53, "Thriller"), (10749, "Romance")]
+DIRECTORS = ["Ada Quinn", "Bo Marsh", "Cy Lund", "Di Park", "Ed Vance", "Flo Reyes", "Gus Hale", "Ivy Stone"]
+
+
+def imdb_id_for(n):
+    return f"tt{IMDB_OFFSET + n:07d}"
+
+
+def movie_number(imdb_id):
+    """Synthetic movie number for an IMDb ID with or without "tt", or None for other IDs."""
+    digits = imdb_id[2:] if imdb_id.startswith("tt") else imdb_id
+    return int(digits) - IMDB_OFFSET if digits.isdigit() and int(digits) > IMDB_OFFSET else None
+
+
+def synthetic_movie(n, seed=0):
+    """
+    Deterministic metadata for synthetic movie n (1-based).
+
+    Returns:
+        dict: tmdb_id, imdb_id, title, year, director, genres, overview, poster_path, page (Wikipedia title).
+    """
+    rng = random.Random(seed * 1000003 + n)
+    title = " ".join(rng.sample(TITLE_WORDS, rng.randint(2, 3))).title()
+    year = rng.randint(1950, 2024)
+    return {
+        "tmdb_id": n,
+        "imdb_id": imdb_id_for(n),
+        "title": f"{title} {n}",
+        "year": year,
+        "director": rng.choice(DIRECTORS),
+        "genres": rng.sample(GENRES, 2),
+        "overview": " ".join(rng.choices(SCRIPT_WORDS, k=40)).capitalize() + ".",
+        "poster_path": f"/synthetic{n}.jpg",
+        "page": f"{title} {n} ({year} film)",
+    }
+
+
+def synthetic_script(n, size=60000, seed=0):
+    """A screenplay-shaped text of about `size` characters: scene headings, action lines and dialogue."""
+    rng = random.Random(seed * 1000003 + n)
+    lines = []
+    length = 0
+    while length < size:
+        lines.append(f"\n{rng.choice(['INT.', 'EXT.'])} {rng.choice(TITLE_WORDS).upper()} - {rng.choice(['DAY', 'NIGHT'])}\n")
+        for _ in range(rng.randint(4, 12)):
+            if rng.random() < 0.5:
+                lines.append(" ".join(rng.choices(SCRIPT_WORDS, k=rng.randint(6, 18))).capitalize() + ".")
+            else:
+                lines.append(f"          {rng.choice(DIRECTORS).split()[0].upper()}")
+                lines.append("     " + " ".join(rng.choices(SCRIPT_WORDS, k=rng.randint(3, 12))).capitalize() + "?")
+        length = sum(len(line) + 1 for line in lines)
+    return "\n".join(lines)
+
+
+class SyntheticServices:
+    """Generates TMDB, Wikipedia, Wikidata, sfy.ru and Daily Script responses for movies 1..movies."""
+    def __init__(self, movies, seed=0, script_size=60000):
+        self.movies = movies
+        self.seed = seed
+        self.script_size = script_size
+        self.lookup_lock = threading.Lock()
+        self.by_title = None
+        self.by_page = None
+
+    def movie(self, n):
+        return synthetic_movie(n, self.seed) if n and 1 <= n <= self.movies else None
+
+    def respond(self, service, path, params):
+        """Returns (status, content_type, body bytes)."""
+        handler = getattr(self, f"_{service}", None)
+        result = handler(path, params) if handler else None
+        if result is None:
+            return 404, "application/json", b'{"status_message": "The resource you requested could not be found."}'
+        if isinstance(result, str):
+            return 200, "text/html; charset=utf-8", result.encode("utf-8")
+        return 200, "application/json", json.dumps(result).encode("utf-8")
+
+    def _lookups(self):
+        # Title and page indexes for search requests, built once on first use
+        with self.lookup_lock:
+            if self.by_title is None:
+                movies = [self.movie(n) for n in range(1, self.movies + 1)]
+                self.by_title = {movie["title"].lower(): movie for movie in movies}
+                self.by_page = {movie["page"]: movie for movie in movies}
+        return self.by_title, self.by_page
+
+    def _tmdb(self, path, params):
+        parts = path.strip("/").split("/")[1:]  # drop the API version
+        if parts[:1] == ["find"] and len(parts) == 2:
+            movie = self.movie(movie_number(parts[1]))
+            return {"movie_results": [self._tmdb_result(movie)] if movie else []}
+        if parts[:2] == ["search", "movie"]:
+            movie = self._lookups()[0].get(params.get("query", "").lower())
+            return {"page": 1, "results": [self._tmdb_result(movie)] if movie else []}
+        if parts[:1] == ["movie"] and len(parts) in (2, 3) and parts[1].isdigit():
+            movie = self.movie(int(parts[1]))
+            if movie is None:
+                return None
+            if len(parts) == 3:
+                return self._tmdb_credits(movie) if parts[2] == "credits" else None
+            details = dict(self._tmdb_result(movie), imdb_id=movie["imdb_id"], overview=movie["overview"],
+                           genres=[{"id": genre_id, "name": name} for genre_id, name in movie["genres"]])
+            if "credits" in params.get("append_to_response", "").split(","):
+                details["credits"] = self._tmdb_credits(movie)
+            return details
+        return None
+
+    @staticmethod
+    def _tmdb_result(movie):
+        return {"id": movie["tmdb_id"], "title": movie["title"], "poster_path": movie["poster_path"],
+                "release_date": f"{movie['year']}-06-01"}
+
+    @staticmethod
+    def _tmdb_credits(movie):
+        return {"id": movie["tmdb_id"], "cast": [],
+                "crew": [{"job": "Producer", "name": "Pat Doe"}, {"job": "Director", "name": movie["director"]}]}
+
+    def _wikipedia(self, path, params):
+        by_title, by_page = self._lookups()
+        if params.get("list") == "search":
+            query = params.get("srsearch", "").lower()
+            # Searches are "title director"; the title is every word up to the director's name
+            words = query.split()
+            movie = next((by_title[" ".join(words[:end])] for end in range(len(words), 0, -1)
+                          if " ".join(words[:end]) in by_title), None)
+            return {"query": {"search": [{"title": movie["page"]}] if movie else []}}
+        if params.get("action") == "parse":
+            movie = by_page.get(params.get("page"))
+            if movie is None:
+                return {"error": {"code": "missingtitle"}}
+            rng = random.Random(self.seed * 1000003 + movie["tmdb_id"])
+            paragraphs = lambda count: "".join(
+                "<p>" + " ".join(rng.choices(SCRIPT_WORDS, k=60)) + "<sup class=\"reference\">[1]</sup></p>"
+                for _ in range(count)
+            )
+            sections = ["Plot", "Cast", "Themes", "Reception"]
+            text = "<div class=\"mw-parser-output\">" + paragraphs(1) + "".join(
+                f"<div class=\"mw-heading mw-heading2\"><h2 id=\"{name}\">{name}</h2></div>{paragraphs(3)}"
+                for name in sections
+            ) + "</div>"
+            return {"parse": {"title": movie["page"], "text": {"*": text},
+                              "sections": [{"line": name, "level": "2", "number": str(i + 1)}
+                                           for i, name in enumerate(sections)]}}
+        return None
+
+    def _wikidata(self, path, params):
+        if params.get("list") == "search":
+            imdb_ids = re.findall(r"P345=(tt\d+)", params.get("srsearch", ""))
+            return {"query": {"search": [{"title": f"Q{movie_number(imdb_id)}"} for imdb_id in imdb_ids
+                                         if self.movie(movie_number(imdb_id))]}}
+        if params.get("action") == "wbgetentities":
+            entities = {}
+            for item_id in params.get("ids", "").split("|"):
+                movie = self.movie(int(item_id[1:])) if item_id[1:].isdigit() else None
+                if movie:
+                    entities[item_id] = {
+                        "id": item_id,
+                        "sitelinks": {"enwiki": {"site": "enwiki", "title": movie["page"]}},
+                        "claims": {"P345": [{"mainsnak": {"datavalue": {"value": movie["imdb_id"]}}}]},
+                    }
+            return {"entities": entities}
+        return None
+
+    def _sfy(self, path, params):
+        if path.rstrip("/") == "/scripts":
+            links = "".join(f"<a href=\"/script/{n}\">{self.movie(n)['title']}</a><br>\n"
+                            for n in range(1, self.movies + 1))
+            return f"<html><body>{links}</body></html>"
+        match = re.fullmatch(r"/script/(\d+)", path)
+        movie = self.movie(int(match.group(1))) if match else None
+        if movie is None:
+            return None
+        script = synthetic_script(movie["tmdb_id"], self.script_size, self.seed)
+        return (f"<html><body><h1>{movie['title']}</h1>"
+                f"<a href=\"https://www.imdb.com/title/{movie['imdb_id']}/\">More info about this movie on IMDb.com</a>"
+                f"<p>FOR EDUCATIONAL PURPOSES ONLY</p><pre>{script}</pre></body></html>")
+
+    def _dailyscript(self, path, params):
+        name = path.strip("/")
+        if name in ("movie.html", "movie_n-z.html"):
+            first_half = name == "movie.html"
+            # Titles A-M are listed on the first page and N-Z on the second, as on the real site
+            rows = "".join(
+                f"<p><a href=\"scripts/{movie['tmdb_id']}.html\">{movie['title']}</a> "
+                f"(<a href=\"http://www.imdb.com/title/{movie['imdb_id']}/\">IMDb</a>)</p>\n"
+                for movie in map(self.movie, range(1, self.movies + 1))
+                if (movie["title"][0] < "N") == first_half
+            )
+            return f"<html><body>{rows}</body></html>"
+        match = re.fullmatch(r"scripts/(\d+)\.html", name)
+        movie = self.movie(int(match.group(1))) if match else None
+        if movie is None:
+            return None
+        return f"<html><body><pre>{synthetic_script(movie['tmdb_id'], self.script_size, self.seed)}</pre></body></html>"
+
+
+def fixture_request(path, params):
+    return path + "?" + "&".join(f"{key}={value}" for key, value in sorted(params.items()) if key not in IGNORED_PARAMS)
+
+
+def fixture_key(path, params):
+    return hashlib.sha256(fixture_request(path, params).encode("utf-8")).hexdigest()[:24]
+
+
+def read_fixture(fixtures_dir, service, path, params):
+    """Returns a recorded (status, content_type, body), or None if nothing was recorded for the request."""
+    try:
+        with open(os.path.join(fixtures_dir, service, fixture_key(path, params) + ".json"), encoding="utf-8") as f:
+            fixture = json.load(f)
+    except OSError:
+        return None
+    body = base64.b64decode(fixture["body"]) if fixture.get("base64") else fixture["body"].encode("utf-8")
+    return fixture["status"], fixture["content_type"], body
+
+
+def record_fixture(fixtures_dir, service, path, params=None):
+    """Fetches a request from the live service and saves it as a fixture. Returns the fixture path."""
+    import requests
+    params = dict(params or {})
+    if service == "tmdb" and os.getenv("TMDB_API_KEY"):
+        params.setdefault("api_key", os.getenv("TMDB_API_KEY"))
+    response = requests.get(UPSTREAMS[service] + path, params=params, timeout=30)
+    try:
+        body, binary = response.content.decode("utf-8"), False
+    except UnicodeDecodeError:
+        body, binary = base64.b64encode(response.content).decode("ascii"), True
+
+    os.makedirs(os.path.join(fixtures_dir, service), exist_ok=True)
+    fixture_path = os.path.join(fixtures_dir, service, fixture_key(path, params) + ".json")
+    with open(fixture_path, "w", encoding="utf-8") as f:
+        json.dump({"request": fixture_request(path, params), "status": response.status_code, "base64": binary,
+                   "content_type": response.headers.get("Content-Type", "application/octet-stream"),
+                   "body": body}, f)
+    return fixture_path
+
+
+class StubServices:
+    """
+    Threaded local HTTP server standing in for the external services.
+
+    Every response is delayed by `latency` seconds (plus up to `jitter` more,
+    from a seeded generator) to model the round-trip of the real service; a dict
+    sets the latency per service. Request counts per service are kept in `hits`.
+    """
+    def __init__(self, movies=10000, latency=0.0, jitter=0.0, seed=0, script_size=60000,
+                 fixtures_dir=FIXTURES_DIR, port=0):
+        self.synthetic = SyntheticServices(movies, seed, script_size)
+        self.latency = latency
+        self.jitter = jitter
+        self.fixtures_dir = fixtures_dir
+        self.rng = random.Random(seed)
+        self.hits = {service: 0 for service in UPSTREAMS}
+        self.lock = threading.Lock()
+
+        stubs = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stubs.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def url(self, service):
+        return f"{self.base_url}/{service}"
+
+    def env(self):
+        """Environment variables that point app.py, LoopScript and the scrapers at the stand-ins."""
+        return {
+            "TMDB_BASE_URL": self.url("tmdb") + "/3",
+            "WIKIPEDIA_API_URL": self.url("wikipedia") + "/w/api.php",
+            "WIKIDATA_API_URL": self.url("wikidata") + "/w/api.php",
+            "SFY_URL": self.url("sfy"),
+            "DAILYSCRIPT_URL": self.url("dailyscript") + "/",
+        }
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="stub-services", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def delay(self, service):
+        latency = self.latency.get(service, 0.0) if isinstance(self.latency, dict) else self.latency
+        with self.lock:
+            extra = self.rng.random() * self.jitter
+        return latency + extra
+
+    def handle(self, request):
+        url = urlsplit(request.path)
+        service, _, path = url.path.lstrip("/").partition("/")
+        path = "/" + unquote(path)
+        params = dict(parse_qsl(url.query, keep_blank_values=True))
+        if service not in self.hits:
+            status, content_type, body = 404, "text/plain", b"unknown service"
+        else:
+            with self.lock:
+                self.hits[service] += 1
+            response = read_fixture(self.fixtures_dir, service, path, params)
+            status, content_type, body = response or self.synthetic.respond(service, path, params)
+            time.sleep(self.delay(service))
+
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) >= 4 and sys.argv[1] == "record":
+        print(record_fixture(FIXTURES_DIR, sys.argv[2], sys.argv[3], dict(parse_qsl(sys.argv[4])) if len(sys.argv) > 4 else None))
+    elif len(sys.argv) >= 2 and sys.argv[1] == "serve":
+        stubs = StubServices(port=int(sys.argv[2]) if len(sys.argv) > 2 else 8900).start()
+        for name, value in stubs.env().items():
+            print(f"export {name}={quote(value, safe=':/')}")
+        stubs.thread.join()
+    else:
+        print("Usage: python benchmarks/stub_servers.py record <service> <path> [query] | serve [port]")
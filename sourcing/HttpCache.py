@@ -0,0 +1,298 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit
+import requests
+from Metrics import outbound
+
+
+class CachedResponse:
+    """The parts of requests.Response the scrapers use, backed by a cached body."""
+    def __init__(self, url, status_code, content, headers, from_cache):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        encoding = requests.utils.get_encoding_from_headers(self.headers) or "utf-8"
+        return self.content.decode(encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class HttpCache:
+    """
+    On-disk cache for scraper HTTP traffic, keyed by URL and query parameters.
+
+    Bodies are zlib-compressed files under cache_dir with a small SQLite index.
+    Entries younger than `ttl` are served without touching the network; older
+    ones are revalidated with ETag / Last-Modified. The least recently used
+    entries are evicted once the cache grows past `max_bytes`. In offline mode
+    only cached responses are returned and misses come back as status 504.
+    """
+    def __init__(self, cache_dir=".cache/http", ttl=30 * 24 * 3600, max_bytes=2 * 1024 ** 3, offline=False, timeout=30):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0}
+        self.lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(cache_dir, "index.db"), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, url, params=None, headers=None):
+        """
+        GETs a URL through the cache.
+
+        Args:
+            url (str): The URL to fetch.
+            params (dict, optional): Query parameters (part of the cache key).
+            headers (dict, optional): Extra request headers (not part of the cache key).
+
+        Returns:
+            CachedResponse: The cached or freshly fetched response.
+        """
+        key = self.cache_key(url, params)
+        entry = self._lookup(key)
+        if entry is not None:
+            entry["content"] = self._read_body(key)
+            if entry["content"] is None:
+                self._delete(key)
+                entry = None
+
+        if entry is not None and (self.offline or time.time() - entry["stored_at"] < self.ttl):
+            return self._hit(key, entry, "hits")
+
+        if self.offline:
+            with self.lock:
+                self.stats["misses"] += 1
+            return CachedResponse(url, 504, b"", {}, from_cache=False)
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry["etag"]:
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        with outbound(urlsplit(url).netloc) as call:
+            response = self.session.get(url, params=params, headers=request_headers, timeout=self.timeout)
+            call["outcome"] = response.status_code
+        if response.status_code == 304 and entry is not None:
+            self._touch(key, stored=True)
+            return self._hit(key, entry, "revalidated")
+
+        with self.lock:
+            self.stats["misses"] += 1
+        if response.status_code in (200, 404):
+            self._store(key, url, response)
+        return CachedResponse(url, response.status_code, response.content, dict(response.headers), from_cache=False)
+
+    def download(self, url, dest_path, params=None, chunk_size=64 * 1024):
+        """
+        Streams a URL's body to dest_path through the cache without holding it in memory.
+
+        Args:
+            url (str): The URL to fetch.
+            dest_path (str): File to write the (uncompressed) body to.
+            params (dict, optional): Query parameters (part of the cache key).
+
+        Returns:
+            int: The HTTP status code (504 for an offline miss).
+        """
+        key = self.cache_key(url, params)
+        entry = self._lookup(key)
+        if entry is not None and not os.path.exists(self.body_path(key)):
+            self._delete(key)
+            entry = None
+
+        if entry is not None and (self.offline or time.time() - entry["stored_at"] < self.ttl):
+            self._copy_body(key, dest_path, chunk_size)
+            self._touch(key)
+            with self.lock:
+                self.stats["hits"] += 1
+            return entry["status"]
+
+        if self.offline:
+            with self.lock:
+                self.stats["misses"] += 1
+            return 504
+
+        request_headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        with outbound(urlsplit(url).netloc) as call, \
+                self.session.get(url, params=params, headers=request_headers, timeout=self.timeout, stream=True) as response:
+            call["outcome"] = response.status_code
+            if response.status_code == 304 and entry is not None:
+                self._copy_body(key, dest_path, chunk_size)
+                self._touch(key, stored=True)
+                with self.lock:
+                    self.stats["revalidated"] += 1
+                return entry["status"]
+
+            with self.lock:
+                self.stats["misses"] += 1
+
+            # Write the plain body for the caller and a compressed copy for the cache in one pass
+            path = self.body_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            compressor = zlib.compressobj(6)
+            with open(dest_path, "wb") as dest, open(f"{path}.tmp", "wb") as body_file:
+                for chunk in response.iter_content(chunk_size):
+                    dest.write(chunk)
+                    body_file.write(compressor.compress(chunk))
+                body_file.write(compressor.flush())
+
+            if response.status_code in (200, 404):
+                os.replace(f"{path}.tmp", path)
+                self._index(key, url, response.status_code, response.headers, os.path.getsize(path))
+            else:
+                os.remove(f"{path}.tmp")
+            return response.status_code
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["revalidated"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["revalidated"]) / lookups if lookups else 0.0
+        return stats
+
+    @staticmethod
+    def cache_key(url, params=None):
+        canonical = json.dumps([url, sorted((params or {}).items())], default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def body_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.z")
+
+    def _hit(self, key, entry, stat):
+        self._touch(key)
+        with self.lock:
+            self.stats[stat] += 1
+        return CachedResponse(entry["url"], entry["status"], entry["content"], entry["headers"], from_cache=True)
+
+    def _read_body(self, key):
+        try:
+            with open(self.body_path(key), "rb") as body_file:
+                return zlib.decompress(body_file.read())
+        except (OSError, zlib.error):
+            return None
+
+    def _copy_body(self, key, dest_path, chunk_size):
+        decompressor = zlib.decompressobj()
+        with open(self.body_path(key), "rb") as body_file, open(dest_path, "wb") as dest:
+            for chunk in iter(lambda: body_file.read(chunk_size), b""):
+                dest.write(decompressor.decompress(chunk))
+            dest.write(decompressor.flush())
+
+    def _lookup(self, key):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT url, status, headers, etag, last_modified, stored_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        url, status, headers, etag, last_modified, stored_at = row
+        return {"url": url, "status": status, "headers": json.loads(headers), "etag": etag,
+                "last_modified": last_modified, "stored_at": stored_at}
+
+    def _store(self, key, url, response):
+        compressed = zlib.compress(response.content, 6)
+        path = self.body_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "wb") as body_file:
+            body_file.write(compressed)
+        os.replace(f"{path}.tmp", path)
+        self._index(key, url, response.status_code, response.headers, len(compressed))
+
+    def _index(self, key, url, status, headers, size):
+        now = time.time()
+        with self.lock:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO entries
+                    (key, url, status, headers, etag, last_modified, size, stored_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (key, url, status, json.dumps(dict(headers)),
+                  headers.get("ETag"), headers.get("Last-Modified"), size, now, now))
+            self.conn.commit()
+        self._evict()
+
+    def _touch(self, key, stored=False):
+        now = time.time()
+        with self.lock:
+            if stored:
+                self.conn.execute("UPDATE entries SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            else:
+                self.conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+
+    def _delete(self, key):
+        with self.lock:
+            self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.conn.commit()
+        try:
+            os.remove(self.body_path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        with self.lock:
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            victims = []
+            for key, size in self.conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+                if total <= self.max_bytes:
+                    break
+                victims.append(key)
+                total -= size
+        for key in victims:
+            self._delete(key)
+
+
+shared_cache = None
+shared_cache_lock = threading.Lock()
+
+
+def get_http_cache():
+    """Returns the process-wide HttpCache, configured from the environment on first use."""
+    global shared_cache
+    with shared_cache_lock:
+        if shared_cache is None:
+            shared_cache = HttpCache(
+                cache_dir=os.getenv("HTTP_CACHE_DIR", ".cache/http"),
+                ttl=int(os.getenv("HTTP_CACHE_TTL", 30 * 24 * 3600)),
+                max_bytes=int(os.getenv("HTTP_CACHE_MAX_BYTES", 2 * 1024 ** 3)),
+                offline=os.getenv("STREAMSAFE_OFFLINE") == "1"
+            )
+        return shared_cache
@@ -1,31 +1,91 @@
 from urllib.parse import urljoin
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import tempfile
+import threading
+import time
 import pymupdf
-import requests
 from bs4 import BeautifulSoup
-from io import BytesIO
-from PyPDF2 import PdfReader 
+from sourcing.HttpCache import get_http_cache
+
+# Scripts with at least this many pages are split across PDF_EXTRACT_WORKERS processes
+PARALLEL_PAGE_THRESHOLD = 200
+
+
+def extract_page_range(pdf_path, start, stop):
+    """Extracts the text of pages [start, stop) of a PDF. Module-level so worker processes can run it."""
+    with pymupdf.open(pdf_path) as pdf_document:
+        return "".join(pdf_document[page_num].get_text() for page_num in range(start, stop))
 
 
 
 class ScriptScraper:
     def __init__(self):
-        self.dailyscript_base_url = "https://www.dailyscript.com/movie.html"
-        self.dailyscript_second_url ="https://www.dailyscript.com/movie_n-z.html"
-        self.dailyscript_site_url = "https://www.dailyscript.com/"
-        self.sfy_base_url = "https://sfy.ru/scripts"
-        self.sfy_site_url = "https://sfy.ru"
+        # Site roots are configurable so benchmarks can point the scraper at local stand-ins
+        self.dailyscript_site_url = os.getenv("DAILYSCRIPT_URL", "https://www.dailyscript.com/")
+        self.dailyscript_base_url = self.dailyscript_site_url + "movie.html"
+        self.dailyscript_second_url = self.dailyscript_site_url + "movie_n-z.html"
+        self.sfy_site_url = os.getenv("SFY_URL", "https://sfy.ru")
+        self.sfy_base_url = f"{self.sfy_site_url}/scripts"
+
+        # Shared on-disk HTTP cache; reruns replay pages and PDFs without network I/O
+        self.http = get_http_cache()
+
+        # Parsed script-site listings, kept on disk so each index is crawled once per TTL
+        self.index_dir = os.getenv("SCRIPT_INDEX_DIR", ".cache/script_index")
+        self.index_ttl = int(os.getenv("SCRIPT_INDEX_TTL", 7 * 24 * 3600))
+        self.indexes = {}
+        self.index_lock = threading.Lock()
     
     def pdf_to_text(self, pdf_path):
-        text = ""
         try:
-            pdf_document = pymupdf.open(pdf_path)
-            for page_num in range(pdf_document.page_count):
-                page = pdf_document[page_num]
-                text += page.get_text()
-            pdf_document.close()
+            return self.extract_pdf_text(pdf_path)
         except Exception as e:
             print(f"An error occurred: {e}")
-        return text
+        return ""
+
+    def extract_pdf_text(self, pdf_path, workers=None):
+        """
+        Extracts all text from a PDF file with pymupdf, joining pages in one pass.
+
+        Args:
+            pdf_path (str): Path to the PDF.
+            workers (int, optional): Processes to split large PDFs across by page range.
+                Defaults to the PDF_EXTRACT_WORKERS environment variable (1 = no pool).
+
+        Returns:
+            str: The extracted text.
+        """
+        workers = workers or int(os.getenv("PDF_EXTRACT_WORKERS", 1))
+        with pymupdf.open(pdf_path) as pdf_document:
+            page_count = pdf_document.page_count
+            if workers <= 1 or page_count < PARALLEL_PAGE_THRESHOLD:
+                return "".join(page.get_text() for page in pdf_document)
+
+        step = -(-page_count // workers)
+        starts = list(range(0, page_count, step))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = pool.map(extract_page_range, [pdf_path] * len(starts), starts,
+                             [min(start + step, page_count) for start in starts])
+            return "".join(parts)
+
+    def get_script(self, title, imdb_id):
+        """
+        Fetches a script from sfy.ru, falling back to Daily Script.
+
+        Args:
+            title (str): The movie title (e.g., "Ace Ventura: Pet Detective").
+            imdb_id (str): The IMDb ID of the movie without the "tt" prefix (e.g., "0109040").
+
+        Returns:
+            tuple: (script text or None, URL it was fetched from or None). The text may be
+                   an error message, as with sfy_get and dailyscript_get.
+        """
+        script, source_url = self.sfy_fetch(title, imdb_id)
+        if not script:
+            script, source_url = self.dailyscript_fetch(imdb_id)
+        return script, source_url
 
     def sfy_get(self, title, imdb_id):
         """
@@ -38,36 +98,43 @@ class ScriptScraper:
         Returns:
             str: The script text if found, or None if not found.
         """
+        return self.sfy_fetch(title, imdb_id)[0]
+
+    def sfy_fetch(self, title, imdb_id):
+        """Like sfy_get, but returns (script text or None, source URL or None)."""
+        movie_page_url = None
         try:
-            # Step 1: Fetch the main scripts page
-            response = requests.get(self.sfy_base_url)
-            if response.status_code != 200:
-                return f"Failed to fetch SFY scripts page. Status code: {response.status_code}"
+            # Step 1: Look the movie up in the cached scripts index (IMDb ID, then exact title)
+            index = self.get_sfy_index()
+            if index is None:
+                return "Failed to fetch SFY scripts page.", None
 
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Step 2: Search for the movie title
-            movie_link = None
-            links = soup.find_all('a', href=True)
-            for link in links:
-                if title.lower() in link.text.lower():
-                    movie_link = urljoin(self.sfy_site_url, link['href'])
-                    break
-            
+            movie_link = index["by_imdb"].get(imdb_id) or index["by_title"].get(title.lower())
+
+            # Step 2: Fall back to the first listing containing the title, scanned in memory
             if not movie_link:
-                return None  # Movie title not found
+                movie_link = next((url for text, url in index["links"] if title.lower() in text), None)
+
+            if not movie_link:
+                return None, None  # Movie title not found
             # Step 3: Navigate to the movie's page
             movie_page_url = f"{movie_link}"
-            movie_response = requests.get(movie_page_url)
+            movie_response = self.http.get(movie_page_url)
             if movie_response.status_code != 200:
-                return f"Failed to fetch the movie page at {movie_page_url}. Status code: {movie_response.status_code}"
+                return f"Failed to fetch the movie page at {movie_page_url}. Status code: {movie_response.status_code}", movie_page_url
 
             movie_soup = BeautifulSoup(movie_response.content, 'html.parser')
 
             # Step 4: Verify IMDb ID on the movie page
             imdb_link = movie_soup.find('a', href=True, text="More info about this movie on IMDb.com")
             if not imdb_link or imdb_id not in imdb_link['href']:
-                return None  # IMDb ID does not match
+                return None, None  # IMDb ID does not match
+
+            # Remember the verified page so the next lookup for this IMDb ID is a direct hit
+            if index["by_imdb"].get(imdb_id) != movie_link:
+                with self.index_lock:
+                    index["by_imdb"][imdb_id] = movie_link
+                    self._write_index("sfy", index)
 
             # Step 5: Check for a PDF link
             pdf_link = movie_soup.find('a', href=lambda href: href and href.lower().endswith('.pdf'))
@@ -76,22 +143,18 @@ class ScriptScraper:
                 if not pdf_url.startswith("http"):
                     pdf_url = urljoin(self.sfy_site_url, pdf_url)
                 
-                # Check if the PDF actually exists
-                pdf_response = requests.head(pdf_url)
-                if pdf_response.status_code == 404:
-                    return None 
-
-                return self.fetch_pdf_script(pdf_url)
+                # fetch_pdf_script returns None if the PDF does not exist
+                return self.fetch_pdf_script(pdf_url), pdf_url
 
             # Step 6: Extract the script after "FOR EDUCATIONAL PURPOSES ONLY"
             script_text = movie_soup.get_text(separator="\n")
             split_text = script_text.split("FOR EDUCATIONAL PURPOSES ONLY")
             if len(split_text) > 1:
-                return split_text[1].strip()  # Return the script content after the marker
+                return split_text[1].strip(), movie_page_url  # Return the script content after the marker
 
-            return None  # If no script is found
+            return None, None  # If no script is found
         except Exception as e:
-            return f"An error occurred: {str(e)}"
+            return f"An error occurred: {str(e)}", movie_page_url
 
     def dailyscript_get(self, imdb_id):
         """
@@ -103,50 +166,128 @@ class ScriptScraper:
         Returns:
             str: The script text if found, or an error message if not found.
         """
+        return self.dailyscript_fetch(imdb_id)[0]
+
+    def dailyscript_fetch(self, imdb_id):
+        """Like dailyscript_get, but returns (script text or None, source URL or None)."""
+        full_script_url = None
         try:
-            # Fetch the main page with the list of scripts
-            for url in [self.dailyscript_base_url, self.dailyscript_second_url]:
-                response = requests.get(url)
-                if response.status_code != 200:
-                    return f"Failed to fetch Daily Script page. Status code: {response.status_code}"
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                rows = soup.find_all('a')  # Assuming links are in <a> tags
-                
-                # Search for the script using the IMDb ID
-                for link in rows:
-                    href = link.get('href')
-                    if href and 'imdb.com/' in href:
-                        # Extract IMDb ID from 'title/ttXXXXXXX' or similar formats
-                        if 'imdb.com/title/' in href:
-                            imdb_id_part = href.split('imdb.com/title/tt')[-1]
-                        elif 'imdb.com/Title?' in href:
-                            imdb_id_part = href.split('imdb.com/Title?')[-1]
-                        else:
-                            continue  # Skip unrelated links
-                        
-                        # Extract the valid IMDb ID (ttXXXXXXX) from the part before any extra data
-                        extracted_id = imdb_id_part.split('/')[0].split('?')[0]  # Split by '/' or '?'
-                                        
-                        # Check if the extracted IMDb ID matches the target
-                        if extracted_id == imdb_id:
-                            # Find the script link (previous <a> tag)
-                            parent = link.find_parent()
-                            all_links = parent.find_all('a', href=True)
-                            for sibling_link in all_links:
-                                if sibling_link != link:
-                                    script_link = sibling_link.get('href')
-                                    if script_link:
-                                        # Add the base URL and fetch the script
-                                        full_script_url = self.dailyscript_site_url + script_link
-                                        if script_link.lower().endswith('.pdf'):  # Convert to lowercase for case-insensitive check
-                                            return self.fetch_pdf_script(full_script_url)
-                                        else:  # Assume it's an HTML script
-                                            return self.fetch_html_script(full_script_url)
-            return None
+            # Look the script up in the cached Daily Script index
+            index = self.get_dailyscript_index()
+            if index is None:
+                return "Failed to fetch Daily Script page.", None
+
+            full_script_url = index["by_imdb"].get(imdb_id)
+            if not full_script_url:
+                return None, None
+            if full_script_url.lower().endswith('.pdf'):  # Convert to lowercase for case-insensitive check
+                return self.fetch_pdf_script(full_script_url), full_script_url
+            else:  # Assume it's an HTML script
+                return self.fetch_html_script(full_script_url), full_script_url
         except Exception as e:
-            return f"An error occurred: {str(e)}"
-        
+            return f"An error occurred: {str(e)}", full_script_url
+
+    def get_sfy_index(self):
+        """
+        Returns the sfy.ru scripts listing as lookup tables, crawling it at most once per TTL.
+
+        Returns:
+            dict: "links" ([text, url] in page order), "by_title" (lowercased link text -> url)
+                  and "by_imdb" (IMDb ID -> url, filled in as movie pages are verified),
+                  or None if the listing could not be fetched.
+        """
+        return self._get_index("sfy", self._build_sfy_index)
+
+    def get_dailyscript_index(self):
+        """
+        Returns the Daily Script listings as lookup tables, crawling them at most once per TTL.
+
+        Returns:
+            dict: "by_imdb" (IMDb ID without "tt" -> script url) and "by_title"
+                  (lowercased link text -> script url), or None if a listing could not be fetched.
+        """
+        return self._get_index("dailyscript", self._build_dailyscript_index)
+
+    def _build_sfy_index(self):
+        response = self.http.get(self.sfy_base_url)
+        if response.status_code != 200:
+            print(f"Failed to fetch SFY scripts page. Status code: {response.status_code}")
+            return None
+
+        soup = BeautifulSoup(response.content, 'html.parser')
+        index = {"links": [], "by_title": {}, "by_imdb": {}}
+        for link in soup.find_all('a', href=True):
+            text = link.text.strip().lower()
+            url = urljoin(self.sfy_site_url, link['href'])
+            index["links"].append([text, url])
+            index["by_title"].setdefault(text, url)
+        return index
+
+    def _build_dailyscript_index(self):
+        index = {"by_imdb": {}, "by_title": {}}
+        for url in [self.dailyscript_base_url, self.dailyscript_second_url]:
+            response = self.http.get(url)
+            if response.status_code != 200:
+                print(f"Failed to fetch Daily Script page. Status code: {response.status_code}")
+                return None
+
+            soup = BeautifulSoup(response.content, 'html.parser')
+            for link in soup.find_all('a'):  # Assuming links are in <a> tags
+                href = link.get('href')
+                if not href or 'imdb.com/' not in href:
+                    continue
+
+                # Extract IMDb ID from 'title/ttXXXXXXX' or similar formats
+                if 'imdb.com/title/' in href:
+                    imdb_id_part = href.split('imdb.com/title/tt')[-1]
+                elif 'imdb.com/Title?' in href:
+                    imdb_id_part = href.split('imdb.com/Title?')[-1]
+                else:
+                    continue  # Skip unrelated links
+                extracted_id = imdb_id_part.split('/')[0].split('?')[0]  # Split by '/' or '?'
+
+                # The script link is the other <a> tag next to the IMDb link
+                parent = link.find_parent()
+                for sibling_link in parent.find_all('a', href=True):
+                    script_link = sibling_link.get('href')
+                    if sibling_link != link and script_link:
+                        full_script_url = self.dailyscript_site_url + script_link
+                        index["by_imdb"].setdefault(extracted_id, full_script_url)
+                        index["by_title"].setdefault(sibling_link.text.strip().lower(), full_script_url)
+                        break
+        return index
+
+    def _get_index(self, name, build):
+        with self.index_lock:
+            index = self.indexes.get(name)
+            if index is None or time.time() - index["fetched_at"] > self.index_ttl:
+                index = self._read_index(name)
+            if index is None:
+                index = build()
+                if index is None:
+                    return None
+                index["fetched_at"] = time.time()
+                self._write_index(name, index)
+            self.indexes[name] = index
+            return index
+
+    def _read_index(self, name):
+        path = os.path.join(self.index_dir, f"{name}.json")
+        try:
+            with open(path, encoding="utf-8") as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError):
+            return None
+        if time.time() - index.get("fetched_at", 0) > self.index_ttl:
+            return None
+        return index
+
+    def _write_index(self, name, index):
+        os.makedirs(self.index_dir, exist_ok=True)
+        path = os.path.join(self.index_dir, f"{name}.json")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as index_file:
+            json.dump(index, index_file)
+        os.replace(f"{path}.tmp", path)
 
     def fetch_html_script(self, script_url):
         """
@@ -159,7 +300,7 @@ class ScriptScraper:
             str: The content of the script as plain text.
         """
         try:
-            response = requests.get(script_url)
+            response = self.http.get(script_url)
             if response.status_code != 200:
                 return f"Failed to fetch script from {script_url}. Status code: {response.status_code}"
             
@@ -175,29 +316,27 @@ class ScriptScraper:
     def fetch_pdf_script(self, script_url):
         """
         Fetches the script text from a PDF script URL.
+
+        The PDF is streamed to a temporary file (through the HTTP cache) and
+        extracted with pymupdf, so only one copy of the document is held.
         
         Args:
             script_url (str): The full URL to the PDF script.
             
         Returns:
-            str: The extracted text from the PDF.
+            str: The extracted text from the PDF, or None if the PDF does not exist.
         """
+        pdf_file = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+        pdf_file.close()
         try:
-            response = requests.get(script_url)
-            if response.status_code != 200:
-                return f"Failed to fetch PDF script from {script_url}. Status code: {response.status_code}"
-            
-            # Read the PDF content
-            pdf_content = BytesIO(response.content)
-            pdf_reader = PdfReader(pdf_content)
-            
-            # Extract text from each page
-            script_text = ""
-            for page in pdf_reader.pages:
-                script_text += page.extract_text()
-            
-            return script_text.strip()
+            status_code = self.http.download(script_url, pdf_file.name)
+            if status_code == 404:
+                return None
+            if status_code != 200:
+                return f"Failed to fetch PDF script from {script_url}. Status code: {status_code}"
+
+            return self.extract_pdf_text(pdf_file.name).strip()
         except Exception as e:
             return f"An error occurred while fetching the PDF script: {str(e)}"
-
-
+        finally:
+            os.remove(pdf_file.name)
@@ -1,11 +1,26 @@
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString
+from concurrent.futures import ThreadPoolExecutor
+import html
+import os
 import re
+from sourcing.HttpCache import get_http_cache
+
+# Cleanup applied to each section's plain text
+EDIT_LINK_RE = re.compile(r"\[\nedit\n\]")
+NEWLINES_RE = re.compile(r"\n+")
+CARET_RE = re.compile(r"\^\s*\n")
+TAG_RE = re.compile(r"<[^>]+>")
+
+# wbgetentities accepts at most 50 ids per call
+WIKIDATA_BATCH_SIZE = 50
 
 class SumScraper:
     def __init__(self):
-        self.wiki_base_url = "https://en.wikipedia.org/w/api.php"
-        self.wikidata_base_url = "https://www.wikidata.org/w/api.php"
+        self.wiki_base_url = os.getenv("WIKIPEDIA_API_URL", "https://en.wikipedia.org/w/api.php")
+        self.wikidata_base_url = os.getenv("WIKIDATA_API_URL", "https://www.wikidata.org/w/api.php")
+
+        # Shared on-disk HTTP cache; repeated lookups (e.g. few-shot examples) cost no network I/O
+        self.http = get_http_cache()
 
     def get_wikipedia_summary(self, movie_title, director_name=None, imdb_id=None):
         """
@@ -24,6 +39,31 @@ class SumScraper:
         if imdb_id:
             page_title = self.get_wikipedia_page_from_wikidata(imdb_id)
 
+        return self.get_summary_for_page(movie_title, director_name, page_title)
+
+    def get_wikipedia_summaries(self, movies, workers=4):
+        """
+        Fetches summaries for a whole batch of movies.
+
+        Wikidata is queried once per 50 IMDb IDs, then each page is fetched with a
+        single parse request, several pages at a time.
+
+        Args:
+            movies (list): (movie_title, director_name, imdb_id) tuples.
+            workers (int): Number of pages fetched concurrently.
+
+        Returns:
+            list: One summary dict per movie, in the same order.
+        """
+        pages = self.get_wikipedia_pages_from_wikidata([imdb_id for _, _, imdb_id in movies if imdb_id])
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(
+                lambda movie: self.get_summary_for_page(movie[0], movie[1], pages.get(movie[2])),
+                movies
+            ))
+
+    def get_summary_for_page(self, movie_title, director_name, page_title):
+        """Fetches the relevant sections for a known page title, searching Wikipedia if it is None."""
         # Step 2: If Wikidata fails, search Wikipedia by title + director
         if not page_title:
             page_title = self.search_wikipedia_page(movie_title, director_name)
@@ -31,37 +71,74 @@ class SumScraper:
         if not page_title:
             return {"error": f"No Wikipedia page found for '{movie_title}'"}
 
-        # Step 3: Fetch the table of contents (sections)
-        sections = self.get_wikipedia_sections(page_title)
+        # Step 3: Fetch the table of contents and the full page text in one request
+        sections, page_html = self.get_wikipedia_page(page_title)
         if not sections:
             return {"error": f"No sections found for '{page_title}'"}
 
-        # Step 4: Filter and fetch relevant sections
+        # Step 4: Filter and split out relevant sections locally
         relevant_sections = self.filter_relevant_sections(sections)
         if not relevant_sections:
             return {"error": f"No relevant content found for '{page_title}'"}
 
-        details = self.fetch_section_content(page_title, relevant_sections)
+        details = self.split_sections(page_html, relevant_sections)
         return details if details else {"error": f"No detailed content retrieved for '{page_title}'"}
 
     def get_wikipedia_page_from_wikidata(self, imdb_id):
         """Fetches the Wikipedia page title from Wikidata using the IMDb ID."""
-        params = {
-            "action": "wbgetentities",
-            "format": "json",
-            "props": "sitelinks",
-            "sites": "enwiki",
-            "ids": f"P345:{imdb_id}"  # P345 is the IMDb ID property in Wikidata
-        }
-        response = requests.get(self.wikidata_base_url, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            entities = data.get("entities", {})
-            for entity in entities.values():
+        return self.get_wikipedia_pages_from_wikidata([imdb_id]).get(imdb_id)
+
+    def get_wikipedia_pages_from_wikidata(self, imdb_ids):
+        """
+        Maps many IMDb IDs to English Wikipedia page titles with two Wikidata requests per 50 IDs.
+
+        Args:
+            imdb_ids (list): IMDb IDs (e.g., "tt7286456").
+
+        Returns:
+            dict: imdb_id -> page title for every ID Wikidata knows.
+        """
+        pages = {}
+        for start in range(0, len(imdb_ids), WIKIDATA_BATCH_SIZE):
+            batch = imdb_ids[start:start + WIKIDATA_BATCH_SIZE]
+
+            # One search finds the items carrying any of these IMDb IDs (P345 is the IMDb ID property)
+            search_params = {
+                "action": "query",
+                "list": "search",
+                "srsearch": "haswbstatement:" + "|".join(f"P345={imdb_id}" for imdb_id in batch),
+                "srlimit": 2 * len(batch),
+                "format": "json"
+            }
+            response = self.http.get(self.wikidata_base_url, params=search_params)
+            if response.status_code != 200:
+                continue
+            item_ids = [result["title"] for result in response.json().get("query", {}).get("search", [])]
+            if not item_ids:
+                continue
+
+            # One wbgetentities call returns the sitelinks and IMDb claims for all of them
+            params = {
+                "action": "wbgetentities",
+                "format": "json",
+                "props": "sitelinks|claims",
+                "sitefilter": "enwiki",
+                "ids": "|".join(item_ids[:WIKIDATA_BATCH_SIZE])
+            }
+            response = self.http.get(self.wikidata_base_url, params=params)
+            if response.status_code != 200:
+                continue
+
+            wanted = set(batch)
+            for entity in response.json().get("entities", {}).values():
                 site_links = entity.get("sitelinks", {})
-                if "enwiki" in site_links:
-                    return site_links["enwiki"]["title"]
-        return None
+                if "enwiki" not in site_links:
+                    continue
+                for claim in entity.get("claims", {}).get("P345", []):
+                    value = claim.get("mainsnak", {}).get("datavalue", {}).get("value")
+                    if value in wanted:
+                        pages.setdefault(value, site_links["enwiki"]["title"])
+        return pages
 
     def search_wikipedia_page(self, movie_title, director_name):
         """Searches Wikipedia for the movie title."""
@@ -72,48 +149,64 @@ class SumScraper:
             "srsearch": search_query,
             "format": "json"
         }
-        response = requests.get(self.wiki_base_url, params=search_params)
+        response = self.http.get(self.wiki_base_url, params=search_params)
         if response.status_code == 200:
             results = response.json().get("query", {}).get("search", [])
             return results[0]["title"] if results else None
         return None
 
-    def get_wikipedia_sections(self, page_title):
-        """Fetches the sections of a Wikipedia page."""
+    def get_wikipedia_page(self, page_title):
+        """Fetches the sections and full HTML of a Wikipedia page in one request."""
         content_params = {
             "action": "parse",
             "page": page_title,
-            "prop": "sections",
+            "prop": "sections|text",
+            "redirects": 1,
             "format": "json"
         }
-        response = requests.get(self.wiki_base_url, params=content_params)
+        response = self.http.get(self.wiki_base_url, params=content_params)
         if response.status_code == 200:
-            return response.json().get("parse", {}).get("sections", [])
-        return None
+            parse = response.json().get("parse", {})
+            return parse.get("sections", []), parse.get("text", {}).get("*", "")
+        return None, None
 
     def filter_relevant_sections(self, sections):
         """Filters sections based on relevant keywords."""
         keywords = ["plot", "synopsis", "theme", "analysis", "story", "overview"]
         return [s for s in sections if any(kw in s["line"].lower() for kw in keywords)]
 
-    def fetch_section_content(self, page_title, sections):
-        """Fetches the content of relevant sections."""
+    def split_sections(self, page_html, sections):
+        """
+        Splits the wanted sections out of a full page with a single HTML parse.
+
+        A section runs from its heading up to the next heading of the same or a
+        higher level, so a section includes its subsections (as action=parse does).
+        """
+        soup = BeautifulSoup(page_html, "html.parser")
+
+        # Remove footnotes, references and edit links once for the whole page
+        for element in soup.find_all("sup", class_="reference") + soup.find_all(class_="mw-editsection"):
+            element.decompose()
+
+        root = soup.find("div", class_="mw-parser-output") or soup
+        blocks = list(root.children)
+        headings = []  # (block position, level, title)
+        for position, block in enumerate(blocks):
+            heading = self._heading(block)
+            if heading:
+                headings.append((position, *heading))
+
+        wanted = [html.unescape(TAG_RE.sub("", section["line"])).strip() for section in sections]
         details = {}
-        for section in sections:
-            section_id = section["index"]
-            section_title = section["line"]
-
-            section_params = {
-                "action": "parse",
-                "page": page_title,
-                "section": section_id,
-                "prop": "text",
-                "format": "json"
-            }
-            response = requests.get(self.wiki_base_url, params=section_params)
-            if response.status_code == 200:
-                section_html = response.json().get("parse", {}).get("text", {}).get("*", "")
-                details[section_title] = self.strip_html_tags(section_html)
+        for i, (position, level, title) in enumerate(headings):
+            if title not in wanted:
+                continue
+            end = next((p for p, l, _ in headings[i + 1:] if l <= level), len(blocks))
+            text = "".join(
+                str(block) if isinstance(block, NavigableString) else block.get_text(separator="\n")
+                for block in blocks[position:end]
+            )
+            details[title] = self.clean_text(text)
         return details
 
     def strip_html_tags(self, html_content):
@@ -124,12 +217,28 @@ class SumScraper:
         for sup in soup.find_all("sup", class_="reference"):
             sup.decompose()
 
-        # Extract plain text and clean up
-        text = soup.get_text(separator="\n")
-        text = re.sub(r"\[\nedit\n\]", "", text)  # Remove "[edit]"
-        text = re.sub(r"\n+", "\n", text)  # Replace multiple newlines with a single newline
-        text = re.split(r"\^\s*\n", text, maxsplit=1)[0]  # Split at the first caret and remove everything after it
-        text = re.sub(r"\n+", "\n", text)  # Replace multiple newlines with a single newline
-        text = text.strip()  # Remove leading and trailing whitespace
-
-        return text
\ No newline at end of file
+        return self.clean_text(soup.get_text(separator="\n"))
+
+    def clean_text(self, text):
+        """Collapses blank lines and drops "[edit]" links and the trailing reference list."""
+        text = EDIT_LINK_RE.sub("", text)  # Remove "[edit]"
+        text = NEWLINES_RE.sub("\n", text)  # Replace multiple newlines with a single newline
+        text = CARET_RE.split(text, maxsplit=1)[0]  # Split at the first caret and remove everything after it
+        text = NEWLINES_RE.sub("\n", text)  # Replace multiple newlines with a single newline
+        return text.strip()  # Remove leading and trailing whitespace
+
+    @staticmethod
+    def _heading(block):
+        # Older markup: <h2><span class="mw-headline">Plot</span></h2>
+        # Newer markup: <div class="mw-heading mw-heading2"><h2 id="Plot">Plot</h2></div>
+        if isinstance(block, NavigableString):
+            return None
+        if block.name in ("h2", "h3", "h4", "h5", "h6"):
+            heading = block
+        elif "mw-heading" in (block.get("class") or []):
+            heading = block.find(["h2", "h3", "h4", "h5", "h6"])
+        else:
+            return None
+        if heading is None:
+            return None
+        return int(heading.name[1]), heading.get_text().strip()